@@ -3,6 +3,7 @@ Research workflow nodes
 """
 import json
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from langchain_core.messages import SystemMessage, HumanMessage
 from config.llm_factory import get_llm
 from state.state import AgentState
@@ -11,6 +12,9 @@ from utils.parser_utils import parse_main_and_sub_questions, parse_subquestion_m
 from prompts.research_prompts import PROMPT_STEP2, PROMPT_STEP3, PROMPT_STEP4
 from utils.research_utils import search_literature
 
+# Concurrent literature searches per workflow run (each search is dominated by API latency)
+LITERATURE_SEARCH_WORKERS = 4
+
 def generate_questions_node(state: AgentState) -> AgentState:
     """Generate multiple main research questions and sub-questions"""
     llm = get_llm()
@@ -272,15 +276,15 @@ def identify_data_gaps_node(state: AgentState) -> AgentState:
     
     return {**state, "data_gaps": data_gaps, "research_variables": research_variables}
 
-def search_literature_node(state: AgentState) -> AgentState:
-    """Node to search for relevant literature for analyzed sub-questions only."""
+def _literature_targets(state: AgentState) -> list:
+    """Analyzed sub-questions to search literature for (capped for faster processing)"""
     # Get mappings to identify which sub-questions were analyzed
     mappings = state.get("mappings", [])
     all_sub_questions = state.get("sub_questions", [])
     
     if not mappings:
         print("Warning: No mappings found, skipping literature search")
-        return {**state, "literature": {}}
+        return []
     
     # Filter to only search literature for analyzed sub-questions
     analyzed_sub_question_ids = {m.sub_question_id for m in mappings if m.sub_question_id}
@@ -288,44 +292,68 @@ def search_literature_node(state: AgentState) -> AgentState:
     
     if not analyzed_sub_questions:
         print("Warning: No analyzed sub-questions found for literature search")
-        return {**state, "literature": {}}
+        return []
     
     print(f"Searching literature for {len(analyzed_sub_questions)} analyzed sub-questions...")
     
-    literature = {}
-    total_start_time = time.time()
-    
     # Limit to maximum 10 sub-questions for faster processing
     max_subquestions = 10
     if len(analyzed_sub_questions) > max_subquestions:
         print(f"Limiting literature search to first {max_subquestions} sub-questions for faster processing")
         analyzed_sub_questions = analyzed_sub_questions[:max_subquestions]
     
-    for i, sq in enumerate(analyzed_sub_questions):
-        print(f"Searching literature for sub-question {i+1}/{len(analyzed_sub_questions)}")
-        
-        # Search for literature relevant to this sub-question
-        query = sq.text
-        papers = search_literature(query, limit=2)  # Limit to 2 papers per sub-question
-        
-        # Convert to LiteratureReference objects (only if we got results)
-        references = []
-        for paper in papers:
-            references.append(
-                LiteratureReference(
-                    title=paper.get("title", ""),
-                    authors=paper.get("authors", []) if paper.get("authors") is not None else [],
-                    abstract=paper.get("abstract", "") if paper.get("abstract") is not None else "",
-                    year=paper.get("year"),
-                    venue=paper.get("venue", "") if paper.get("venue") is not None else "",
-                    url=paper.get("url", "") if paper.get("url") is not None else "",
-                    relevance=paper.get("relevance", 0.0) if paper.get("relevance") is not None else 0.0,
-                    source=paper.get("source", "") if paper.get("source") is not None else "",
-                    sub_question_id=sq.id
-                )
-            )
-        
-        literature[sq.id] = references
+    return analyzed_sub_questions
+
+def _to_literature_references(papers: list, sub_question_id: str) -> list:
+    """Convert raw search hits into LiteratureReference objects"""
+    return [
+        LiteratureReference(
+            title=paper.get("title", ""),
+            authors=paper.get("authors", []) if paper.get("authors") is not None else [],
+            abstract=paper.get("abstract", "") if paper.get("abstract") is not None else "",
+            year=paper.get("year"),
+            venue=paper.get("venue", "") if paper.get("venue") is not None else "",
+            url=paper.get("url", "") if paper.get("url") is not None else "",
+            relevance=paper.get("relevance", 0.0) if paper.get("relevance") is not None else 0.0,
+            source=paper.get("source", "") if paper.get("source") is not None else "",
+            sub_question_id=sub_question_id
+        )
+        for paper in papers
+    ]
+
+def iter_literature_search(sub_questions: list):
+    """Yield (sub_question_id, references) pairs as each sub-question's search completes"""
+    if not sub_questions:
+        return
+    
+    # Sub-questions with the same text share one upstream search
+    by_query = {}
+    for sq in sub_questions:
+        by_query.setdefault(" ".join(sq.text.split()).lower(), []).append(sq)
+    
+    # Search for literature relevant to every distinct query concurrently (network-bound)
+    with ThreadPoolExecutor(max_workers=min(LITERATURE_SEARCH_WORKERS, len(by_query))) as executor:
+        futures = {
+            executor.submit(search_literature, group[0].text, limit=2): group  # Limit to 2 papers per sub-question
+            for group in by_query.values()
+        }
+        for completed, future in enumerate(as_completed(futures), 1):
+            print(f"Literature search finished for query {completed}/{len(by_query)}")
+            papers = future.result()
+            for sq in futures[future]:
+                yield sq.id, _to_literature_references(papers, sq.id)
+
+def search_literature_node(state: AgentState) -> AgentState:
+    """Node to search for relevant literature for analyzed sub-questions only."""
+    analyzed_sub_questions = _literature_targets(state)
+    if not analyzed_sub_questions:
+        return {**state, "literature": {}}
+    
+    total_start_time = time.time()
+    
+    # Collect results, keeping the sub-question order
+    found = dict(iter_literature_search(analyzed_sub_questions))
+    literature = {sq.id: found[sq.id] for sq in analyzed_sub_questions}
     
     total_end_time = time.time()
     print(f"Total literature search completed in {total_end_time - total_start_time:.2f} seconds")
@@ -334,7 +362,7 @@ def search_literature_node(state: AgentState) -> AgentState:
 
 def select_questions_node(state: AgentState) -> AgentState:
     """Node to filter selected main questions and their sub-questions"""
-    selected_main_ids = state.get("selected_main_question_ids", [])
+    selected_main_ids = state.get("selected_main_question_ids") or frozenset()
     all_main_questions = state.get("main_questions", [])
     all_sub_questions = state.get("sub_questions", [])
     
@@ -374,11 +402,9 @@ def answer_subquestions_node(state: AgentState) -> AgentState:
     # Import the enhanced answer generation prompt
     from prompts.research_prompts import PROMPT_ANSWER_GENERATION
     
-    # Process each sub-question mapping to generate a comprehensive answer
-    for mapping in mappings:
-        try:
-            # Create detailed context for answer generation
-            user_message = f"""Please provide a comprehensive answer for the following research sub-question:
+    # Create detailed context for answer generation for every mapping
+    user_messages = [
+        f"""Please provide a comprehensive answer for the following research sub-question:
 
 SUB-QUESTION: {mapping.sub_question}
 
@@ -389,10 +415,17 @@ ANALYSIS APPROACH SPECIFIED:
 {mapping.analysis_approach}
 
 CONTEXT: This sub-question is part of a larger research study. Your answer should be comprehensive, evidence-based, and directly incorporate the data requirements and analysis approach identified above."""
-
-            # Use the LLM to generate a comprehensive answer
-            # Call the LLM wrapper with the explicit answer-generation system prompt
-            response = llm.invoke(user_message, system_prompt=PROMPT_ANSWER_GENERATION)
+        for mapping in mappings
+    ]
+    
+    # Generate all answers concurrently with the explicit answer-generation system prompt
+    responses = llm.invoke_batch(user_messages, system_prompt=PROMPT_ANSWER_GENERATION, return_exceptions=True)
+    
+    # Process each sub-question mapping to build a comprehensive answer
+    for mapping, response in zip(mappings, responses):
+        try:
+            if isinstance(response, Exception):
+                raise response
             answer_text = response.content
             
             # Calculate confidence score based on the completeness of mapping information
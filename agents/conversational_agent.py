@@ -9,6 +9,7 @@ from datetime import datetime, timedelta
 
 from config.llm_factory import get_llm
 from agents.research_assistant import ResearchAssistant
+from agents.session_store import create_session_store
 from utils import database_utils
 from utils import research_utils
 from state.state import AgentState
@@ -25,8 +26,8 @@ class ConversationalAgent:
         self.research_assistant = ResearchAssistant()
         self.db_utils = database_utils  # Module containing database functions
         self.research_utils = research_utils  # Module containing research functions
-        self.sessions = {}  # In-memory session storage
         self.session_timeout = timedelta(hours=24)
+        self.sessions = create_session_store(self.session_timeout)  # In-memory, or Redis when REDIS_URL is set
         
         logging.info("ConversationalAgent initialized with Gemini 2.0 Flash")
     
@@ -87,6 +88,7 @@ What would you like to start with?
         }
         
         self._add_to_conversation(session_id, "assistant", welcome_message.strip())
+        self.sessions.save(session_id)
         
         logging.info(f"Started chat session: {session_id}")
         return response
@@ -134,6 +136,8 @@ What would you like to start with?
                 "timestamp": datetime.now().isoformat()
             }
             return error_response
+        finally:
+            self.sessions.save(session_id)
     
     def _handle_project_setup(self, session_id: str, message: str) -> Dict[str, Any]:
         """Handle project setup conversation"""
@@ -430,6 +434,8 @@ These gaps represent opportunities for original research contribution. Would you
     # Helper methods
     def _is_session_valid(self, session_id: str) -> bool:
         """Check if session exists and is not expired"""
+        # Pick up changes made by other workers before using the session
+        self.sessions.refresh(session_id)
         if session_id not in self.sessions:
             return False
         
@@ -0,0 +1,109 @@
+"""
+Chat session storage backends for the conversational agent.
+Sessions live in process memory by default, or in Redis (REDIS_URL) so any API worker can serve any session.
+"""
+import logging
+import time
+from collections.abc import MutableMapping
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator
+
+import orjson
+from cachetools import TTLCache
+
+from config.redis_client import get_sync_redis_client
+
+SESSION_KEY_PREFIX = "sess:"
+SESSION_INDEX_KEY = "sess:index"  # sorted set of session IDs scored by expiry time
+LOCAL_COPIES_MAXSIZE = 1024  # per-worker bound on sessions loaded but not yet saved
+
+
+class MemorySessionStore(dict):
+    """Process-local session storage (single worker only)"""
+    
+    def refresh(self, session_id: str) -> None:
+        """Nothing to reload: the local dict is the source of truth"""
+    
+    def save(self, session_id: str) -> None:
+        """Nothing to persist: sessions are mutated in place"""
+
+
+def _encode_default(obj: Any) -> Any:
+    # Pydantic models (e.g. generated questions) are stored as plain dicts
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    return str(obj)
+
+
+class RedisSessionStore(MutableMapping):
+    """
+    Sessions persisted in Redis as orjson blobs with a TTL.
+    A request works on a local copy: refresh() reloads it from Redis and save() writes it back
+    and drops it. Copies that are read but never saved expire with the session TTL.
+    """
+    
+    def __init__(self, client, ttl: timedelta):
+        self._client = client
+        self._ttl_seconds = int(ttl.total_seconds())
+        self._local: Dict[str, Dict[str, Any]] = TTLCache(maxsize=LOCAL_COPIES_MAXSIZE, ttl=self._ttl_seconds)
+    
+    def _key(self, session_id: str) -> str:
+        return f"{SESSION_KEY_PREFIX}{session_id}"
+    
+    def refresh(self, session_id: str) -> None:
+        """Reload a session so updates made by other workers are seen"""
+        raw = self._client.get(self._key(session_id))
+        if raw is None:
+            self._local.pop(session_id, None)
+            return
+        session = orjson.loads(raw)
+        session["created_at"] = datetime.fromisoformat(session["created_at"])
+        self._local[session_id] = session
+    
+    def save(self, session_id: str) -> None:
+        """Write the local copy back, push its expiry forward and release the copy"""
+        session = self._local.pop(session_id, None)
+        if session is None:
+            return
+        payload = orjson.dumps(session, default=_encode_default)
+        pipe = self._client.pipeline()
+        pipe.set(self._key(session_id), payload, ex=self._ttl_seconds)
+        pipe.zadd(SESSION_INDEX_KEY, {session_id: time.time() + self._ttl_seconds})
+        pipe.execute()
+    
+    def __getitem__(self, session_id: str) -> Dict[str, Any]:
+        if session_id not in self._local:
+            self.refresh(session_id)
+        return self._local[session_id]
+    
+    def __setitem__(self, session_id: str, session: Dict[str, Any]) -> None:
+        self._local[session_id] = session
+        self.save(session_id)
+    
+    def __delitem__(self, session_id: str) -> None:
+        self._local.pop(session_id, None)
+        pipe = self._client.pipeline()
+        pipe.delete(self._key(session_id))
+        pipe.zrem(SESSION_INDEX_KEY, session_id)
+        deleted, _ = pipe.execute()
+        if not deleted:
+            raise KeyError(session_id)
+    
+    def __iter__(self) -> Iterator[str]:
+        # Drop index entries whose keys have already expired, then list the rest
+        self._client.zremrangebyscore(SESSION_INDEX_KEY, "-inf", time.time())
+        for session_id in self._client.zrange(SESSION_INDEX_KEY, 0, -1):
+            yield session_id.decode()
+    
+    def __len__(self) -> int:
+        self._client.zremrangebyscore(SESSION_INDEX_KEY, "-inf", time.time())
+        return self._client.zcard(SESSION_INDEX_KEY)
+
+
+def create_session_store(ttl: timedelta):
+    """Redis-backed store when REDIS_URL is configured, otherwise an in-memory dict"""
+    client = get_sync_redis_client()
+    if client is None:
+        return MemorySessionStore()
+    logging.info("Chat sessions stored in Redis")
+    return RedisSessionStore(client, ttl)
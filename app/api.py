@@ -2,10 +2,14 @@
 REST API endpoints with session management
 """
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
 from typing import Dict, Any, List
+import asyncio
+import hashlib
 import uuid
 from datetime import datetime, timedelta
 import json
+import orjson
 
 from model.models import (
     ProjectRequest, SessionRequest, ResearchQuestionResponse, 
@@ -15,9 +19,12 @@ from model.models import (
     SubQuestionAnalysisRequest, SubQuestionAnswer, SubQuestionAnswersResponse,
     DatabaseSchemaResponse, TableDetailsResponse
 )
+from state.state import LiteratureTable
 from agents.research_assistant import ResearchAssistant
 from agent_graph.graph import build_graph
 from utils.research_utils import search_literature
+from config.config import get_settings
+from config.redis_client import get_redis_client
 
 router = APIRouter()
 
@@ -43,7 +50,7 @@ class SessionManager:
             "data_gaps": [],
             "literature": {},
             "custom_sub_questions": custom_sub_questions or [],
-            "selected_main_question_ids": [],
+            "selected_main_question_ids": frozenset(),
             "questions_filtered": False,
             "sub_question_answers": [],
             "created_at": datetime.now().isoformat(),
@@ -81,6 +88,95 @@ class SessionManager:
 # Initialize session manager
 session_manager = SessionManager()
 
+def _format_data_gaps(data_gaps: List[Any]) -> List[Dict[str, Any]]:
+    """Format DataGap objects for API responses (DataGap already has exactly the DataGapResponse fields)"""
+    return [gap.model_dump() for gap in data_gaps]
+
+def _format_literature(literature: Dict[str, List[Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Format literature references per sub-question for API responses, most relevant first"""
+    literature_table = LiteratureTable.from_literature(literature)
+    return {
+        sub_question_id: [
+            {
+                "id": paper.id,
+                "title": paper.title,
+                "authors": paper.authors,
+                "abstract": paper.abstract,
+                "year": paper.year,
+                "venue": paper.venue,
+                "url": paper.url,
+                "relevance": paper.relevance,
+                "source": paper.source,
+                "sub_question_id": paper.sub_question_id
+            }
+            for paper in papers
+        ]
+        for sub_question_id, papers in literature_table.by_sub_question().items()
+    }
+
+def _filter_to_main_questions(state: Dict[str, Any], main_question_ids: List[str]):
+    """Validate main question IDs and return (requested IDs, state holding only their sub-questions)"""
+    # Check if we have questions generated
+    if not state.get("main_questions") or not state.get("sub_questions"):
+        raise HTTPException(
+            status_code=400, 
+            detail="No questions found in session. Please run generate-questions endpoint first."
+        )
+    
+    # Validate main question IDs
+    requested_main_ids = frozenset(main_question_ids)
+    available_main_ids = {mq.id for mq in state.get("main_questions", [])}
+    invalid_ids = [qid for qid in main_question_ids if qid not in available_main_ids]
+    
+    if invalid_ids:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid main question IDs: {invalid_ids}"
+        )
+    
+    # Filter sub-questions to only include those linked to specified main questions
+    filtered_sub_questions = [
+        sq for sq in state.get("sub_questions", [])
+        if sq.parent_question_id in requested_main_ids
+    ]
+    
+    if not filtered_sub_questions:
+        raise HTTPException(
+            status_code=400,
+            detail="No sub-questions found for the specified main question IDs"
+        )
+    
+    # Create a temporary state with only the selected sub-questions
+    return requested_main_ids, {**state, "sub_questions": filtered_sub_questions}
+
+def _format_answers(session_id: str, answers: List[Dict[str, Any]]) -> SubQuestionAnswersResponse:
+    """Build the sub-question answers response with its quality summary"""
+    formatted_answers = [
+        SubQuestionAnswer(
+            sub_question_id=answer["sub_question_id"],
+            sub_question_text=answer["sub_question_text"],
+            answer=answer["answer"],
+            confidence_score=answer.get("confidence_score", 0.8),
+            sources_used=answer.get("sources_used", [])
+        )
+        for answer in answers
+    ]
+    
+    # Calculate average confidence and analyze answer quality
+    avg_confidence = sum(ans.confidence_score or 0 for ans in formatted_answers) / len(formatted_answers) if formatted_answers else 0
+    high_quality_answers = sum(1 for ans in formatted_answers if (ans.confidence_score or 0) >= 0.8)
+    
+    processing_summary = f"Generated {len(formatted_answers)} comprehensive answers (avg. confidence: {avg_confidence:.2f}). "
+    processing_summary += f"{high_quality_answers} high-quality answers were produced based on detailed data requirements and analysis approaches. "
+    processing_summary += f"Each answer incorporates the specific data variables and analytical methods identified in the previous mapping step."
+    
+    return SubQuestionAnswersResponse(
+        session_id=session_id,
+        answers=formatted_answers,
+        total_answered=len(formatted_answers),
+        processing_summary=processing_summary
+    )
+
 # 1. Main question and sub-questions generation
 @router.post("/generate-questions", response_model=Dict[str, Any])
 async def generate_questions(project: ProjectRequest):
@@ -108,7 +204,7 @@ async def generate_questions(project: ProjectRequest):
         
         # Run only the question generation step
         from agent_graph.nodes.research_nodes import generate_questions_node
-        result = generate_questions_node(state)
+        result = await asyncio.to_thread(generate_questions_node, state)
         
         # Update session with results
         session_manager.update_session(session_id, result)
@@ -133,12 +229,13 @@ async def generate_questions(project: ProjectRequest):
             for mq in result["main_questions"]
         ]
         
-        return {
+        # Serialise straight to bytes; skips FastAPI's jsonable_encoder pass over the nested models
+        return ORJSONResponse({
             "session_id": session_id,
-            "main_questions": main_questions,
+            "main_questions": [mq.model_dump() for mq in main_questions],
             "expires_at": session_manager.expiry[session_id].isoformat(),
             "message": "Questions generated successfully"
-        }
+        })
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error generating questions: {str(e)}")
@@ -155,66 +252,26 @@ async def analyze_subquestions(request: SubQuestionAnalysisRequest):
         if not state:
             raise HTTPException(status_code=404, detail="Session not found or expired")
         
-        # Check if we have questions generated
-        if not state.get("main_questions") or not state.get("sub_questions"):
-            raise HTTPException(
-                status_code=400, 
-                detail="No questions found in session. Please run generate-questions endpoint first."
-            )
-        
-        # Validate main question IDs
-        available_main_ids = [mq.id for mq in state.get("main_questions", [])]
-        invalid_ids = [qid for qid in request.main_question_ids if qid not in available_main_ids]
-        
-        if invalid_ids:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid main question IDs: {invalid_ids}"
-            )
-        
-        # Filter sub-questions to only include those linked to specified main questions
-        filtered_sub_questions = [
-            sq for sq in state.get("sub_questions", [])
-            if sq.parent_question_id in request.main_question_ids
-        ]
-        
-        if not filtered_sub_questions:
-            raise HTTPException(
-                status_code=400,
-                detail="No sub-questions found for the specified main question IDs"
-            )
-        
-        # Create a temporary state with only the selected sub-questions
-        filtered_state = {**state, "sub_questions": filtered_sub_questions}
+        requested_main_ids, filtered_state = _filter_to_main_questions(state, request.main_question_ids)
         
         # Run the mapping step with filtered questions
         from agent_graph.nodes.research_nodes import map_subquestions_node
-        result = map_subquestions_node(filtered_state)
+        result = await asyncio.to_thread(map_subquestions_node, filtered_state)
         
         # Update the session state with:
         # 1. The new mappings
         # 2. The analyzed main question IDs (so user can continue with same session)
         update_data = {
             **result,
-            "selected_main_question_ids": request.main_question_ids,  # Track what was analyzed
+            "selected_main_question_ids": requested_main_ids,  # Track what was analyzed
             "questions_filtered": True  # Mark that questions have been processed
         }
         
         # Update session with results
         session_manager.update_session(request.session_id, update_data)
         
-        # Format response
-        mappings = [
-            SubQuestionMappingResponse(
-                sub_question_id=mapping.sub_question_id,
-                sub_question=mapping.sub_question,
-                data_requirements=mapping.data_requirements,
-                analysis_approach=mapping.analysis_approach
-            )
-            for mapping in result["mappings"]
-        ]
-        
-        return mappings
+        # SubQuestionMap carries exactly the SubQuestionMappingResponse fields; dump once, skip re-validation
+        return ORJSONResponse([mapping.model_dump() for mapping in result["mappings"]])
         
     except HTTPException:
         raise
@@ -246,43 +303,74 @@ async def analyze_selected_subquestions(session: SessionRequest):
         
         # Use the new answering node to generate answers
         from agent_graph.nodes.research_nodes import answer_subquestions_node
-        result = answer_subquestions_node(state)
+        result = await asyncio.to_thread(answer_subquestions_node, state)
         
         # Update session with the answers
         session_manager.update_session(session.session_id, result)
         
         # Format response with comprehensive answer information
         answers = result.get("sub_question_answers", [])
-        formatted_answers = [
-            SubQuestionAnswer(
-                sub_question_id=answer["sub_question_id"],
-                sub_question_text=answer["sub_question_text"],
-                answer=answer["answer"],
-                confidence_score=answer.get("confidence_score", 0.8),
-                sources_used=answer.get("sources_used", [])
-            )
-            for answer in answers
-        ]
+        return ORJSONResponse(_format_answers(session.session_id, answers).model_dump())
         
-        # Calculate average confidence and analyze answer quality
-        avg_confidence = sum(ans.confidence_score or 0 for ans in formatted_answers) / len(formatted_answers) if formatted_answers else 0
-        high_quality_answers = sum(1 for ans in formatted_answers if (ans.confidence_score or 0) >= 0.8)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error generating sub-question answers: {str(e)}")
+
+# 2d. Fused analysis pipeline
+@router.post("/pipeline")
+async def run_analysis_pipeline(request: SubQuestionAnalysisRequest):
+    """
+    Analyze sub-questions of the given main questions, then answer them and identify data gaps, in one call.
+    Answers and data gaps both only depend on the new mappings, so they run concurrently.
+    """
+    try:
+        # Load the session once for all three steps
+        state = session_manager.get_session(request.session_id)
+        if not state:
+            raise HTTPException(status_code=404, detail="Session not found or expired")
         
-        processing_summary = f"Generated {len(formatted_answers)} comprehensive answers (avg. confidence: {avg_confidence:.2f}). "
-        processing_summary += f"{high_quality_answers} high-quality answers were produced based on detailed data requirements and analysis approaches. "
-        processing_summary += f"Each answer incorporates the specific data variables and analytical methods identified in the previous mapping step."
+        requested_main_ids, filtered_state = _filter_to_main_questions(state, request.main_question_ids)
         
-        return SubQuestionAnswersResponse(
-            session_id=session.session_id,
-            answers=formatted_answers,
-            total_answered=len(formatted_answers),
-            processing_summary=processing_summary
+        from agent_graph.nodes.research_nodes import (
+            map_subquestions_node, answer_subquestions_node, identify_data_gaps_node
+        )
+        mapping_result = await asyncio.to_thread(map_subquestions_node, filtered_state)
+        
+        # Downstream steps see the same state as after /analyze-subquestions: the session with
+        # sub-questions narrowed to the requested main questions, plus the new mappings
+        analyzed_state = mapping_result
+        answers_result, gaps_result = await asyncio.gather(
+            asyncio.to_thread(answer_subquestions_node, analyzed_state),
+            asyncio.to_thread(identify_data_gaps_node, analyzed_state)
         )
         
+        # One session update storing what /analyze-subquestions, /analyze-selected-subquestions and
+        # /identify-data-gaps would, so /session/{id} reports the same counts either way
+        session_manager.update_session(request.session_id, {
+            "sub_questions": filtered_state["sub_questions"],
+            "mappings": mapping_result["mappings"],
+            "selected_main_question_ids": requested_main_ids,
+            "questions_filtered": True,
+            "sub_question_answers": answers_result.get("sub_question_answers", []),
+            "data_gaps": gaps_result["data_gaps"],
+            "research_variables": gaps_result["research_variables"]
+        })
+        
+        return ORJSONResponse({
+            "session_id": request.session_id,
+            "mappings": [mapping.model_dump() for mapping in mapping_result["mappings"]],
+            "answers": _format_answers(
+                request.session_id, answers_result.get("sub_question_answers", [])
+            ).model_dump(),
+            "data_gaps": _format_data_gaps(gaps_result["data_gaps"]),
+            "message": f"Pipeline completed for {len(mapping_result['mappings'])} sub-questions"
+        })
+        
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error generating sub-question answers: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error running analysis pipeline: {str(e)}")
 
 # 2c. Get current analysis status
 @router.get("/analysis-status/{session_id}")
@@ -297,7 +385,7 @@ async def get_analysis_status(session_id: str):
             raise HTTPException(status_code=404, detail="Session not found or expired")
         
         # Get analysis information
-        selected_main_ids = state.get("selected_main_question_ids", [])
+        selected_main_ids = state.get("selected_main_question_ids") or frozenset()
         mappings = state.get("mappings", [])
         answers = state.get("sub_question_answers", [])
         main_questions = state.get("main_questions", [])
@@ -400,7 +488,7 @@ async def explore_relevant_data(session: SessionRequest):
         
         # Run the improved database exploration
         from agent_graph.nodes.research_nodes import explore_database_node
-        result = explore_database_node(state)
+        result = await asyncio.to_thread(explore_database_node, state)
         
         # Update session with exploration results
         session_manager.update_session(session.session_id, result)
@@ -472,24 +560,13 @@ async def identify_data_gaps(session: SessionRequest):
         
         # Run the data gaps identification step
         from agent_graph.nodes.research_nodes import identify_data_gaps_node
-        result = identify_data_gaps_node(state)
+        result = await asyncio.to_thread(identify_data_gaps_node, state)
         
         # Update session with results
         session_manager.update_session(session.session_id, result)
         
         # Format response
-        data_gaps = [
-            DataGapResponse(
-                id=gap.id,
-                missing_variable=gap.missing_variable,
-                gap_description=gap.gap_description,
-                suggested_sources=gap.suggested_sources,
-                sub_question_id=gap.sub_question_id
-            )
-            for gap in result["data_gaps"]
-        ]
-        
-        return data_gaps
+        return ORJSONResponse(_format_data_gaps(result["data_gaps"]))
         
     except HTTPException:
         raise
@@ -518,70 +595,177 @@ async def search_literature_for_analyzed_subquestions(session: SessionRequest):
         
         # Run literature search for analyzed questions only
         from agent_graph.nodes.research_nodes import search_literature_node
-        result = search_literature_node(state)
+        result = await asyncio.to_thread(search_literature_node, state)
         
         # Update session with literature results
         session_manager.update_session(session.session_id, result)
         
-        # Format literature response properly
-        literature_response = {}
-        for sub_question_id, papers in result.get("literature", {}).items():
-            literature_response[sub_question_id] = [
-                {
-                    "id": paper.id,
-                    "title": paper.title,
-                    "authors": paper.authors,
-                    "abstract": paper.abstract,
-                    "year": paper.year,
-                    "venue": paper.venue,
-                    "url": paper.url,
-                    "relevance": paper.relevance,
-                    "source": paper.source,
-                    "sub_question_id": paper.sub_question_id
-                }
-                for paper in papers
-            ]
+        # Return literature results, most relevant papers first
+        return ORJSONResponse({
+            "session_id": session.session_id,
+            "literature": _format_literature(result.get("literature", {})),
+            "message": f"Literature search completed for {len(mappings)} analyzed sub-questions"
+        })
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error searching literature: {str(e)}")
+
+@router.post("/search-literature-analyzed/stream")
+async def stream_literature_for_analyzed_subquestions(session: SessionRequest):
+    """
+    Search literature for analyzed sub-questions, streaming NDJSON as each sub-question completes.
+    Each line is {"sub_question_id", "papers"}; the final line is {"done": true, "message"}.
+    """
+    # Get session data
+    state = session_manager.get_session(session.session_id)
+    if not state:
+        raise HTTPException(status_code=404, detail="Session not found or expired")
+    
+    # Check if we have analyzed sub-questions (mappings)
+    mappings = state.get("mappings", [])
+    if not mappings:
+        raise HTTPException(
+            status_code=400,
+            detail="No analyzed sub-questions found. Please run analyze-subquestions first."
+        )
+    
+    from agent_graph.nodes.research_nodes import _literature_targets, iter_literature_search
+    sub_questions = _literature_targets(state)
+    
+    def generate():
+        # Sync generator: Starlette iterates it in a worker thread
+        found = {}
+        try:
+            for sub_question_id, references in iter_literature_search(sub_questions):
+                found[sub_question_id] = references
+                papers = _format_literature({sub_question_id: references})[sub_question_id]
+                yield orjson.dumps({"sub_question_id": sub_question_id, "papers": papers}) + b"\n"
+            
+            # Update session with literature results in sub-question order
+            literature = {sq.id: found[sq.id] for sq in sub_questions}
+            session_manager.update_session(session.session_id, {"literature": literature})
+            yield orjson.dumps({
+                "done": True,
+                "message": f"Literature search completed for {len(mappings)} analyzed sub-questions"
+            }) + b"\n"
+        except Exception as e:
+            yield orjson.dumps({"error": f"Error searching literature: {str(e)}"}) + b"\n"
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+# 4b. Remaining workflow steps in one call
+@router.post("/run-workflow")
+async def run_remaining_workflow(session: SessionRequest):
+    """
+    Identify data gaps and search literature for the analyzed sub-questions in a single call.
+    Both steps only depend on the analysis mappings, so they run concurrently.
+    """
+    try:
+        # Get session data
+        state = session_manager.get_session(session.session_id)
+        if not state:
+            raise HTTPException(status_code=404, detail="Session not found or expired")
+        
+        # Check if we have analyzed sub-questions (mappings)
+        mappings = state.get("mappings", [])
+        if not mappings:
+            raise HTTPException(
+                status_code=400,
+                detail="No analyzed sub-questions found. Please run analyze-subquestions first."
+            )
+        
+        # Run both independent steps at the same time
+        from agent_graph.nodes.research_nodes import identify_data_gaps_node, search_literature_node
+        gaps_result, literature_result = await asyncio.gather(
+            asyncio.to_thread(identify_data_gaps_node, state),
+            asyncio.to_thread(search_literature_node, state)
+        )
+        
+        # Update session with only the keys each step produced
+        session_manager.update_session(session.session_id, {
+            "data_gaps": gaps_result["data_gaps"],
+            "research_variables": gaps_result["research_variables"],
+            "literature": literature_result["literature"]
+        })
         
-        # Return literature results
         return {
             "session_id": session.session_id,
-            "literature": literature_response,
-            "message": f"Literature search completed for {len(mappings)} analyzed sub-questions"
+            "data_gaps": _format_data_gaps(gaps_result["data_gaps"]),
+            "literature": _format_literature(literature_result["literature"]),
+            "message": f"Data gaps and literature completed for {len(mappings)} analyzed sub-questions"
         }
         
     except HTTPException:
         raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error searching literature: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error running workflow: {str(e)}")
+
+def _format_paper(paper: Dict[str, Any]) -> Dict[str, Any]:
+    """Format a raw literature search hit for API responses"""
+    return {
+        "title": paper.get("title", ""),
+        "authors": paper.get("authors", []),
+        "abstract": paper.get("abstract", ""),
+        "year": paper.get("year"),
+        "venue": paper.get("venue", ""),
+        "url": paper.get("url", ""),
+        "relevance": paper.get("relevance", 0.0),
+        "source": paper.get("source", ""),
+        "citations": paper.get("citations", 0)
+    }
+
+def _literature_cache_key(query: str, limit: int) -> bytes:
+    """Redis key for a direct literature search"""
+    return b"lit:" + hashlib.blake2b(f"{query}|{limit}".encode(), digest_size=16).digest()
 
 # 5. Direct literature search endpoint
 @router.post("/literature/search", response_model=List[Dict[str, Any]])
 async def search_literature_direct(request: LiteratureSearchRequest):
     """
-    Direct literature search for a specific query
+    Direct literature search for a specific query (cached in Redis when REDIS_URL is configured)
     """
+    redis_client = get_redis_client()
+    cache_key = _literature_cache_key(request.query, request.limit)
+    
+    if redis_client is not None:
+        try:
+            cached = await redis_client.get(cache_key)
+            if cached:
+                return Response(cached, media_type="application/json")
+        except Exception as e:
+            print(f"Literature cache read failed: {e}")
+    
     try:
-        papers = search_literature(request.query, limit=request.limit)
-        
-        # Format response
-        formatted_papers = []
-        for paper in papers:
-            formatted_papers.append({
-                "title": paper.get("title", ""),
-                "authors": paper.get("authors", []),
-                "abstract": paper.get("abstract", ""),
-                "year": paper.get("year"),
-                "venue": paper.get("venue", ""),
-                "url": paper.get("url", ""),
-                "relevance": paper.get("relevance", 0.0),
-                "source": paper.get("source", ""),
-                "citations": paper.get("citations", 0)
-            })
-        
-        return formatted_papers
-        
+        papers = await asyncio.to_thread(search_literature, request.query, limit=request.limit)
+        body = orjson.dumps([_format_paper(paper) for paper in papers])
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error searching literature: {str(e)}")
+    
+    if redis_client is not None:
+        try:
+            await redis_client.setex(cache_key, get_settings().literature_cache_ttl, body)
+        except Exception as e:
+            print(f"Literature cache write failed: {e}")
+    
+    return Response(body, media_type="application/json")
+
+@router.post("/literature/search/stream")
+async def search_literature_stream(request: LiteratureSearchRequest):
+    """
+    Direct literature search streamed as NDJSON (one paper per line)
+    """
+    def generate():
+        # Sync generator: Starlette iterates it in a worker thread, so the
+        # blocking search does not stall the event loop
+        try:
+            for paper in search_literature(request.query, limit=request.limit):
+                yield orjson.dumps(_format_paper(paper)) + b"\n"
+        except Exception as e:
+            yield orjson.dumps({"error": f"Error searching literature: {str(e)}"}) + b"\n"
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
 
 # Question selection endpoints
 @router.post("/select-questions", response_model=QuestionSelectionResponse)
@@ -603,7 +787,7 @@ async def select_questions(request: QuestionSelectionRequest):
             )
         
         # Validate selected question IDs
-        available_main_ids = [mq.id for mq in state.get("main_questions", [])]
+        available_main_ids = {mq.id for mq in state.get("main_questions", [])}
         invalid_ids = [qid for qid in request.selected_main_question_ids if qid not in available_main_ids]
         
         if invalid_ids:
@@ -613,7 +797,7 @@ async def select_questions(request: QuestionSelectionRequest):
             )
         
         # Update state with selected question IDs
-        state["selected_main_question_ids"] = request.selected_main_question_ids
+        state["selected_main_question_ids"] = frozenset(request.selected_main_question_ids)
         
         # Filter questions using the selection node
         from agent_graph.nodes.research_nodes import select_questions_node
@@ -747,13 +931,13 @@ async def complete_research_analysis(project: ProjectRequest):
             "data_gaps": [],
             "literature": {},
             "custom_sub_questions": project.custom_sub_questions or [],
-            "selected_main_question_ids": [],
+            "selected_main_question_ids": frozenset(),
             "questions_filtered": False,
             "sub_question_answers": []
         }
         
         # Run the complete workflow
-        result = graph.invoke(state)
+        result = await asyncio.to_thread(graph.invoke, state)
         
         # Format response
         main_questions = [
@@ -815,13 +999,14 @@ async def complete_research_analysis(project: ProjectRequest):
                 for paper in papers
             ]
         
-        return ResearchAnalysisResponse(
+        # Models are already validated; return them directly instead of re-validating against response_model
+        return ORJSONResponse(ResearchAnalysisResponse(
             main_questions=main_questions,
             sub_questions=sub_questions,
             mappings=mappings,
             data_gaps=data_gaps,
             literature=literature
-        )
+        ).model_dump())
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error running complete analysis: {str(e)}")
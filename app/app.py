@@ -12,14 +12,16 @@ sys.path.insert(0, parent_dir)
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 import logging
-from datetime import datetime
 
 from app.api import router as api_router
 from app.chatbot_api import include_chatbot_routes
 from config.config import get_settings
+from utils.research_utils import start_model_warmup
+from utils.time_utils import now_iso
 
 
 @asynccontextmanager
@@ -34,6 +36,19 @@ async def lifespan(app: FastAPI):
     logging.info(f"📡 Server running on {settings.host}:{settings.port}")
     logging.info(f"📚 API documentation available at http://{settings.host}:{settings.port}/docs")
     
+    # Overlap the ranking model's cold start with serving (runs in each worker, after fork)
+    if settings.research_eager_load:
+        start_model_warmup()
+    
+    # Log registered routes (for debugging)
+    if settings.debug:
+        routes_info = sorted(
+            f"{method} {route.path}"
+            for route in app.routes
+            for method in getattr(route, "methods", None) or ()
+        )
+        logging.info("📋 Registered routes:\n" + "\n".join(f"  {route_info}" for route_info in routes_info))
+    
     yield
     
     # Shutdown
@@ -59,6 +74,7 @@ def create_app() -> FastAPI:
             "name": "MIT License",
         },
         lifespan=lifespan,
+        default_response_class=ORJSONResponse,
         docs_url="/docs",
         redoc_url="/redoc",
     )
@@ -72,6 +88,9 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
     
+    # Compress larger JSON bodies (full question trees, literature); small replies skip the overhead
+    app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+    
     # Add trusted host middleware for security
     if settings.environment == "production":
         app.add_middleware(
@@ -91,7 +110,7 @@ def create_app() -> FastAPI:
             content={
                 "error": "Internal server error",
                 "message": "An unexpected error occurred. Please try again later.",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": now_iso()
             }
         )
     
@@ -104,7 +123,7 @@ def create_app() -> FastAPI:
         """
         return {
             "status": "healthy",
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now_iso(),
             "version": "1.0.0",
             "service": "AI Research Agent API"
         }
@@ -140,7 +159,7 @@ def create_app() -> FastAPI:
                 "search_literature": "/api/research/literature",
                 "database_info": "/api/database/info"
             },
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso()
         }
     
     # Include chatbot routes
@@ -153,20 +172,6 @@ def create_app() -> FastAPI:
         tags=["Research API"]
     )
     
-    # Log registered routes (for debugging)
-    @app.on_event("startup")
-    async def log_routes():
-        """Log all registered routes for debugging"""
-        if settings.debug:
-            routes_info = []
-            for route in app.routes:
-                if hasattr(route, 'methods') and hasattr(route, 'path'):
-                    routes_info.append(f"{', '.join(route.methods)} {route.path}")
-            
-            logging.info("📋 Registered routes:")
-            for route_info in sorted(routes_info):
-                logging.info(f"  {route_info}")
-    
     return app
 
 
@@ -174,12 +179,20 @@ def create_app() -> FastAPI:
 if __name__ == "__main__":
     import uvicorn
     
-    app = create_app()
     settings = get_settings()
     
+    # Same rules as main.py: reload and multiple workers are mutually exclusive; never reload in production
+    reload = settings.reload and settings.environment != "production"
+    
+    # Factory mode so each worker builds its own app instance
     uvicorn.run(
-        app,
+        "app.app:create_app",
+        factory=True,
         host=settings.host,
         port=settings.port,
-        reload=settings.reload
+        reload=reload,
+        # "auto" picks uvloop/httptools when installed and falls back to asyncio/h11 (e.g. on Windows)
+        loop="auto",
+        http="auto",
+        workers=None if reload else settings.workers
     )
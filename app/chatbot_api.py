@@ -2,13 +2,16 @@
 Chatbot API endpoints for frontend integration
 Provides REST API interface for the Gemini-powered conversational agent
 """
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
 from typing import Dict, Any, Optional, List
+import asyncio
 import logging
-from datetime import datetime
+import orjson
 
 from agents.conversational_agent import ConversationalAgent
+from utils.time_utils import now_iso
 
 # Initialize router and conversational agent
 chatbot_router = APIRouter(prefix="/api/chatbot", tags=["Chatbot"])
@@ -315,7 +318,7 @@ async def chatbot_health_check():
         
         return {
             "status": "healthy",
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now_iso(),
             "llm_model": "gemini-2.0-flash-exp",
             "llm_status": "connected" if test_response else "disconnected",
             "active_sessions": len(conversational_agent.sessions),
@@ -325,7 +328,7 @@ async def chatbot_health_check():
         logging.error(f"Chatbot health check failed: {e}")
         return {
             "status": "unhealthy",
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now_iso(),
             "error": str(e),
             "service": "Conversational Research Agent"
         }
@@ -349,7 +352,7 @@ async def end_chat_session(session_id: str):
                 "message": "Session ended successfully",
                 "session_id": session_id,
                 "status": "terminated",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": now_iso()
             }
         else:
             raise HTTPException(status_code=404, detail="Session not found")
@@ -381,12 +384,60 @@ async def list_active_sessions():
         return {
             "active_sessions": sessions_info,
             "total_count": len(sessions_info),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso()
         }
     except Exception as e:
         logging.error(f"Error listing sessions: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to list sessions")
 
+# WebSocket chat: one connection carries every message, status and export request for a session
+@chatbot_router.websocket("/ws/{session_id}")
+async def chat_websocket(websocket: WebSocket, session_id: str):
+    """
+    Chat over a single WebSocket connection.
+    
+    Frames are JSON objects:
+        {"type": "message", "text": "...", "action": "chat"} -> chat response
+        {"type": "status"} -> session status
+        {"type": "export"} -> research framework export
+    Errors are sent back as {"error": "...", "status": "error"} and the connection stays open.
+    """
+    await websocket.accept()
+    try:
+        while True:
+            try:
+                frame = orjson.loads(await websocket.receive_text())
+                frame_type = frame.get("type", "message")
+            except (orjson.JSONDecodeError, AttributeError):
+                await websocket.send_text(orjson.dumps({"error": "Frames must be JSON objects", "status": "error"}).decode())
+                continue
+            
+            try:
+                # Agent calls block on the LLM, so keep them off the event loop
+                if frame_type == "message":
+                    result = await asyncio.to_thread(
+                        conversational_agent.chat,
+                        session_id,
+                        frame.get("text", ""),
+                        frame.get("action", "chat")
+                    )
+                    if "error" not in result:
+                        result = {**result, "session_id": session_id}
+                elif frame_type == "status":
+                    result = await asyncio.to_thread(conversational_agent.get_session_status, session_id)
+                elif frame_type == "export":
+                    result = await asyncio.to_thread(conversational_agent.export_research_framework, session_id)
+                else:
+                    result = {"error": f"Unknown frame type: {frame_type}", "status": "error"}
+            except Exception as e:
+                logging.error(f"Error processing WebSocket frame: {e}", exc_info=True)
+                result = {"error": "Failed to process request", "status": "error"}
+            
+            # Encode like the HTTP responses: pydantic models (e.g. generated questions) become plain objects
+            await websocket.send_text(orjson.dumps(jsonable_encoder(result)).decode())
+    except WebSocketDisconnect:
+        logging.info(f"WebSocket closed for chat session: {session_id}")
+
 # Function to include chatbot routes in main app
 def include_chatbot_routes(app):
     """
@@ -9,6 +9,21 @@ from dotenv import load_dotenv
 # Load environment variables from .env file
 load_dotenv()
 
+DEFAULT_ORIGINS = (
+    "http://localhost:3000",
+    "http://localhost:8080",
+    "http://localhost:8501",  # Streamlit default port
+    "http://127.0.0.1:3000",
+    "http://127.0.0.1:8080",
+    "http://127.0.0.1:8501",
+)
+
+DEFAULT_HOSTS = ("localhost", "127.0.0.1", "0.0.0.0")
+
+def _split_env_list(name: str) -> tuple:
+    """Read a comma-separated environment variable as a tuple of non-empty, stripped values"""
+    return tuple(item.strip() for item in os.getenv(name, "").split(",") if item.strip())
+
 class Settings:
     """Application settings"""
     def __init__(self):
@@ -21,6 +36,12 @@ class Settings:
         self.supabase_url: str = os.getenv("SUPABASE_URL", "")
         self.supabase_key: str = os.getenv("SUPABASE_CLIENT_KEY", "")
         
+        # Supabase HTTP connection pool (PostgREST calls reuse warm keep-alive connections)
+        self.supabase_pool_size: int = int(os.getenv("SUPABASE_POOL_SIZE", "20"))
+        self.supabase_max_overflow: int = int(os.getenv("SUPABASE_MAX_OVERFLOW", "10"))
+        self.supabase_pool_timeout: float = float(os.getenv("SUPABASE_POOL_TIMEOUT", "30"))
+        self.supabase_keepalive_expiry: float = float(os.getenv("SUPABASE_KEEPALIVE_EXPIRY", "30"))
+        
         # Debug: Print Supabase config (remove in production)
         if self.debug:
             print(f"Supabase URL loaded: {'Yes' if self.supabase_url else 'No'}")
@@ -32,28 +53,14 @@ class Settings:
         self.port: int = int(os.getenv("PORT", "8000"))
         self.reload: bool = os.getenv("RELOAD", "True").lower() == "true"
         self.factory: bool = True
+        self.workers: int = int(os.getenv("WORKERS", "1"))
         self.environment: str = os.getenv("ENVIRONMENT", "development")
         
-        # CORS settings
-        self.allowed_origins: list = [
-            "http://localhost:3000",
-            "http://localhost:8080", 
-            "http://localhost:8501",  # Streamlit default port
-            "http://127.0.0.1:3000",
-            "http://127.0.0.1:8080",
-            "http://127.0.0.1:8501"
-        ]
-        
-        # Add custom origins from environment
-        custom_origins = os.getenv("ALLOWED_ORIGINS", "")
-        if custom_origins:
-            self.allowed_origins.extend([origin.strip() for origin in custom_origins.split(",")])
+        # CORS settings (frozen tuples, deduplicated in order)
+        self.allowed_origins: tuple = tuple(dict.fromkeys(DEFAULT_ORIGINS + _split_env_list("ALLOWED_ORIGINS")))
         
         # Security settings
-        self.allowed_hosts: list = ["localhost", "127.0.0.1", "0.0.0.0"]
-        custom_hosts = os.getenv("ALLOWED_HOSTS", "")
-        if custom_hosts:
-            self.allowed_hosts.extend([host.strip() for host in custom_hosts.split(",")])
+        self.allowed_hosts: tuple = tuple(dict.fromkeys(DEFAULT_HOSTS + _split_env_list("ALLOWED_HOSTS")))
         
         # Session settings
         self.session_expiry_hours: int = int(os.getenv("SESSION_EXPIRY_HOURS", "24"))
@@ -61,6 +68,16 @@ class Settings:
         # Literature search settings
         self.default_search_limit: int = int(os.getenv("DEFAULT_SEARCH_LIMIT", "10"))
         self.max_search_limit: int = int(os.getenv("MAX_SEARCH_LIMIT", "50"))
+        # int8 dynamic quantization of the ranking model on CPU (set to false for full FP32)
+        self.quantize_embeddings: bool = os.getenv("QUANTIZE_EMBEDDINGS", "True").lower() == "true"
+        # Load the ranking model in a background thread at app startup (set to false for tests/CLI tools)
+        self.research_eager_load: bool = os.getenv("RESEARCH_EAGER_LOAD", "True").lower() in ("true", "1")
+        
+        # Cache settings (Redis is optional; caching is skipped when REDIS_URL is empty)
+        self.redis_url: str = os.getenv("REDIS_URL", "")
+        self.literature_cache_ttl: int = int(os.getenv("LITERATURE_CACHE_TTL", "86400"))
+        # Local sqlite caches (literature results, paper embeddings) survive restarts here
+        self.research_cache_dir: str = os.getenv("RESEARCH_CACHE_DIR", ".cache")
 
 @lru_cache()
 def get_settings():
@@ -1,10 +1,30 @@
 """
 Supabase database client configuration
 """
-from supabase import create_client, Client
-from functools import lru_cache
+import asyncio
+from supabase import create_client, acreate_client, Client, AsyncClient, ClientOptions, AsyncClientOptions
+from functools import lru_cache, cached_property
+from cachetools import TTLCache
+import httpx
 from config.config import get_settings
 
+def _http_pool_options() -> dict:
+    """httpx pool settings: pool_size warm connections kept alive, up to pool_size + max_overflow in flight"""
+    settings = get_settings()
+    return {
+        "limits": httpx.Limits(
+            max_keepalive_connections=settings.supabase_pool_size,
+            max_connections=settings.supabase_pool_size + settings.supabase_max_overflow,
+            # Idle connections are retired before the server side is likely to drop them
+            keepalive_expiry=settings.supabase_keepalive_expiry
+        ),
+        "timeout": httpx.Timeout(30.0, pool=settings.supabase_pool_timeout)
+    }
+
+# Read-through cache settings (per process; use Redis GET/SETEX for multi-worker deployments)
+CACHE_MAXSIZE = 10_000
+CACHE_TTL_SECONDS = 60
+
 @lru_cache()
 def get_supabase_client() -> Client:
     """Get cached Supabase client instance"""
@@ -13,36 +33,78 @@ def get_supabase_client() -> Client:
     if not settings.supabase_url or not settings.supabase_key:
         raise ValueError("Supabase URL and key must be configured")
     
-    return create_client(settings.supabase_url, settings.supabase_key)
+    options = ClientOptions(httpx_client=httpx.Client(**_http_pool_options()))
+    return create_client(settings.supabase_url, settings.supabase_key, options=options)
+
+async def get_async_supabase_client() -> AsyncClient:
+    """Create an async Supabase client backed by a pooled httpx.AsyncClient"""
+    settings = get_settings()
+    
+    if not settings.supabase_url or not settings.supabase_key:
+        raise ValueError("Supabase URL and key must be configured")
+    
+    options = AsyncClientOptions(httpx_client=httpx.AsyncClient(**_http_pool_options()))
+    return await acreate_client(settings.supabase_url, settings.supabase_key, options=options)
 
 class SupabaseManager:
     """Manager class for Supabase operations"""
     
     def __init__(self):
-        self.client = get_supabase_client()
+        self._async_client: AsyncClient | None = None
+        self._async_client_lock = asyncio.Lock()
+        self._session_cache = TTLCache(maxsize=CACHE_MAXSIZE, ttl=CACHE_TTL_SECONDS)
+        self._selection_cache = TTLCache(maxsize=CACHE_MAXSIZE, ttl=CACHE_TTL_SECONDS)
     
-    def save_research_session(self, session_data: dict) -> dict:
-        """Save research session to Supabase"""
+    @cached_property
+    def client(self) -> Client:
+        """Sync client, created on first use so importing this module never needs credentials"""
+        return get_supabase_client()
+    
+    async def get_async_client(self) -> AsyncClient:
+        """Async client, created on first use"""
+        if self._async_client is None:
+            # Concurrent first calls would each build a client and leak all but one httpx pool
+            async with self._async_client_lock:
+                if self._async_client is None:
+                    self._async_client = await get_async_supabase_client()
+        return self._async_client
+    
+    async def upsert_research_session(self, session_data: dict) -> dict:
+        """Create or update a research session in a single round-trip (keyed on session_id)"""
         try:
-            result = self.client.table('research_sessions').insert(session_data).execute()
+            client = await self.get_async_client()
+            result = await client.table('research_sessions').upsert(session_data, on_conflict='session_id').execute()
+            self._session_cache.pop(session_data.get('session_id'), None)
             return result.data[0] if result.data else {}
         except Exception as e:
-            print(f"Error saving session: {e}")
+            print(f"Error upserting session: {e}")
             return {}
     
-    def get_research_session(self, session_id: str) -> dict:
-        """Get research session from Supabase"""
+    async def save_research_session(self, session_data: dict) -> dict:
+        """Save research session to Supabase"""
+        return await self.upsert_research_session(session_data)
+    
+    async def get_research_session(self, session_id: str) -> dict:
+        """Get research session from Supabase (read-through cached)"""
+        if session_id in self._session_cache:
+            return self._session_cache[session_id]
         try:
-            result = self.client.table('research_sessions').select("*").eq('session_id', session_id).execute()
-            return result.data[0] if result.data else {}
+            client = await self.get_async_client()
+            result = await client.table('research_sessions').select("*").eq('session_id', session_id).execute()
+            session = result.data[0] if result.data else {}
+            if session:
+                self._session_cache[session_id] = session
+            return session
         except Exception as e:
             print(f"Error getting session: {e}")
             return {}
     
-    def update_research_session(self, session_id: str, update_data: dict) -> dict:
-        """Update research session in Supabase"""
+    async def update_research_session(self, session_id: str, update_data: dict) -> dict:
+        """Update research session in Supabase (a plain UPDATE: a missing session stays missing)"""
         try:
-            result = self.client.table('research_sessions').update(update_data).eq('session_id', session_id).execute()
+            client = await self.get_async_client()
+            result = await client.table('research_sessions').update(update_data).eq('session_id', session_id).execute()
+            self._session_cache.pop(session_id, None)
             return result.data[0] if result.data else {}
         except Exception as e:
             print(f"Error updating session: {e}")
@@ -56,22 +118,30 @@ class SupabaseManager:
                 'selected_main_question_ids': selected_main_question_ids,
                 'created_at': 'now()'
             }
+            # question_selections.session_id is not UNIQUE, so ON CONFLICT can't target it;
+            # replace the session's previous selection instead
+            self.client.table('question_selections').delete().eq('session_id', session_id).execute()
             result = self.client.table('question_selections').insert(selection_data).execute()
+            self._selection_cache.pop(session_id, None)
             return result.data[0] if result.data else {}
         except Exception as e:
             print(f"Error saving question selection: {e}")
             return {}
     
     def get_selected_questions(self, session_id: str) -> list:
-        """Get selected main question IDs for a session"""
+        """Get selected main question IDs for a session (read-through cached)"""
+        if session_id in self._selection_cache:
+            return self._selection_cache[session_id]
         try:
             result = self.client.table('question_selections').select("selected_main_question_ids").eq('session_id', session_id).execute()
             if result.data:
-                return result.data[0].get('selected_main_question_ids', [])
+                selected = result.data[0].get('selected_main_question_ids', [])
+                self._selection_cache[session_id] = selected
+                return selected
             return []
         except Exception as e:
             print(f"Error getting question selection: {e}")
             return []
 
-# Global instance
+# Global instance (clients are created lazily on first use)
 supabase_manager = SupabaseManager()
@@ -2,16 +2,67 @@
 LLM configuration using Ollama
 """
 import os
-from ollama import Client
+import sys
+import atexit
+import random
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
 from dotenv import load_dotenv
 import logging
 
-# Import research prompts
-from prompts.research_prompts import PROMPT_STEP2, PROMPT_STEP3, PROMPT_STEP4, PROMPT_ANSWER_GENERATION
+@dataclass(frozen=True)
+class _LLMConfig:
+    """LLM settings read from the environment once per process"""
+    ollama_host: str
+    ollama_model: str
+    timeout: int
+    keep_alive: str
 
+
+@lru_cache(maxsize=1)
+def _get_config() -> _LLMConfig:
+    """Load .env once and snapshot the LLM-related environment variables"""
+    load_dotenv()
+    return _LLMConfig(
+        ollama_host=os.getenv("OLLAMA_HOST", "https://api.ollama.vizanalyticx.com"),
+        ollama_model=os.getenv("OLLAMA_MODEL", "mistral:latest"),
+        timeout=int(os.getenv("OLLAMA_TIMEOUT", "180")),  # Default 3 minutes, configurable
+        keep_alive=os.getenv("OLLAMA_KEEP_ALIVE", "30m")  # Keep the model (and prompt KV cache) loaded between calls
+    )
+
+
+@lru_cache(maxsize=None)
+def _get_ollama_client(host: str, timeout: int):
+    """
+    Build one Ollama client per (host, timeout) on top of an HTTP/2,
+    keep-alive pooled httpx transport, closed at interpreter exit.
+    The transport is built here so the pool can be closed without reaching into the client.
+    """
+    # Imported lazily so loading this module does not pull in the SDK
+    import httpx
+    from ollama import Client
+    
+    transport = httpx.HTTPTransport(
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=40, max_connections=100, keepalive_expiry=30.0)
+    )
+    client = Client(
+        host=host,
+        transport=transport,
+        timeout=httpx.Timeout(timeout, connect=10.0)
+    )
+    atexit.register(transport.close)
+    return client
+
+
+@lru_cache(maxsize=8)
 def get_llm(model: str = None, temperature: float = 0.1, host: str = None):
     """
     Returns an Ollama client instance with the given settings.
+    Instances are cached per (model, temperature, host) so callers reuse
+    a client with a warm connection pool.
     
     Args:
         model: The Ollama model to use (defaults to OLLAMA_MODEL from .env)
@@ -21,20 +72,31 @@ def get_llm(model: str = None, temperature: float = 0.1, host: str = None):
     Returns:
         OllamaClient: Configured Ollama client wrapper
     """
-    # Load environment variables
-    load_dotenv()
-    
-    # Get configuration from environment or use defaults
-    ollama_host = host or os.getenv("OLLAMA_HOST", "https://api.ollama.vizanalyticx.com")
-    ollama_model = model or os.getenv("OLLAMA_MODEL", "mistral:latest")
-    timeout = int(os.getenv("OLLAMA_TIMEOUT", "180"))  # Default 3 minutes, configurable
-    print(f"Using Ollama model: {ollama_model} at {ollama_host} with temperature {temperature} and timeout {timeout}s")
+    # Get configuration from the cached environment snapshot or use defaults
+    config = _get_config()
+    ollama_host = host or config.ollama_host
+    ollama_model = model or config.ollama_model
+    timeout = config.timeout
+    logging.info(f"Using Ollama model: {ollama_model} at {ollama_host} with temperature {temperature} and timeout {timeout}s")
     
-    # Initialize the Ollama client with configurable timeout
-    client = Client(host=ollama_host, timeout=timeout)
+    # Shared Ollama client with configurable timeout
+    client = _get_ollama_client(ollama_host, timeout)
     
     # Return wrapped client with our interface
-    return OllamaClient(client, ollama_model, temperature)
+    return OllamaClient(client, ollama_model, temperature, keep_alive=config.keep_alive)
+
+
+@lru_cache(maxsize=1)
+def _get_prompt_map() -> MappingProxyType:
+    """Import the research prompts on first use and freeze them in a read-only, interned map"""
+    from prompts.research_prompts import PROMPT_STEP2, PROMPT_STEP3, PROMPT_STEP4, PROMPT_ANSWER_GENERATION
+    
+    return MappingProxyType({
+        "question_generation": sys.intern(PROMPT_STEP2),
+        "analysis": sys.intern(PROMPT_STEP3),
+        "data_gaps": sys.intern(PROMPT_STEP4),
+        "answer_generation": sys.intern(PROMPT_ANSWER_GENERATION)
+    })
 
 
 def get_system_prompt(task_type: str = "question_generation") -> str:
@@ -47,24 +109,24 @@ def get_system_prompt(task_type: str = "question_generation") -> str:
     Returns:
         The appropriate system prompt string
     """
-    prompt_map = {
-        "question_generation": PROMPT_STEP2,
-        "analysis": PROMPT_STEP3,
-        "data_gaps": PROMPT_STEP4,
-        "answer_generation": PROMPT_ANSWER_GENERATION
-    }
-    
-    return prompt_map.get(task_type, PROMPT_STEP2)
+    prompt_map = _get_prompt_map()
+    return prompt_map.get(task_type, prompt_map["question_generation"])
+
+
+# Errors that will not succeed on retry (bad request, unauthorized, unknown model)
+NON_RETRYABLE_STATUS_CODES = frozenset({400, 401, 404})
+MAX_RETRY_DELAY = 60  # seconds
 
 
 class OllamaClient:
     """
     Wrapper class to provide a consistent interface for Ollama
     """
-    def __init__(self, client, model, temperature):
+    def __init__(self, client, model, temperature, keep_alive: str = "30m"):
         self.client = client
         self.model = model
         self.temperature = temperature
+        self.keep_alive = keep_alive
     
     def invoke(self, prompt: str, system_prompt: str = None):
         """
@@ -90,41 +152,104 @@ class OllamaClient:
             try:
                 logging.info(f"Attempting Ollama call (attempt {attempt + 1}/{max_retries})...")
                 
-                response = self.client.chat(
-                    model=self.model,
-                    messages=[{
-                        "role": "system",
-                        "content": str(system_prompt)
-                    }, {
-                        "role": "user",
-                        "content": str(prompt)
-                    }],
-                    options={
-                        "temperature": float(self.temperature)
-                    }
-                )
+                # Consume the streamed chunks and join once at the end
+                chunks = []
+                for chunk in self.invoke_stream(prompt, system_prompt=system_prompt):
+                    chunks.append(chunk)
                 
                 logging.info("Ollama call successful!")
                 # Return response in expected format
-                return OllamaResponse(response['message']['content'])
+                return OllamaResponse("".join(chunks))
                 
             except Exception as e:
                 logging.warning(f"Ollama call attempt {attempt + 1} failed: {e}")
                 
+                # Permanent failures are raised immediately
+                if getattr(e, "status_code", None) in NON_RETRYABLE_STATUS_CODES:
+                    logging.error(f"Ollama call failed with non-retryable error: {e}")
+                    raise
+                
                 # If this is the last attempt, raise the exception
                 if attempt == max_retries - 1:
                     logging.error(f"All {max_retries} Ollama call attempts failed. Final error: {e}")
                     raise
                 
-                # Wait before retrying (exponential backoff)
-                delay = base_delay * (2 ** attempt)
-                logging.info(f"Waiting {delay} seconds before retry...")
+                # Wait before retrying (random exponential backoff to avoid lock-step retries)
+                delay = min(random.uniform(base_delay, base_delay * (2 ** attempt)), MAX_RETRY_DELAY)
+                logging.info(f"Waiting {delay:.1f} seconds before retry...")
                 time.sleep(delay)
+    
+    def invoke_stream(self, prompt: str, system_prompt: str = None):
+        """
+        Stream the Ollama model's reply to a prompt
+        
+        Args:
+            prompt: The user prompt/question
+            system_prompt: System instructions for the model (defaults to question generation prompt)
+        
+        Yields:
+            Content chunks as the model generates them (no retries)
+        """
+        if system_prompt is None:
+            system_prompt = get_system_prompt("question_generation")
+        
+        # The system prompt is always the first message and sent verbatim so
+        # the server can reuse its cached prompt prefix across calls
+        stream = self.client.chat(
+            model=self.model,
+            messages=[{
+                "role": "system",
+                "content": system_prompt
+            }, {
+                "role": "user",
+                "content": prompt
+            }],
+            options={
+                "temperature": float(self.temperature)
+            },
+            keep_alive=self.keep_alive,
+            stream=True
+        )
+        
+        for chunk in stream:
+            content = chunk['message']['content']
+            if content:
+                yield content
+    
+    def invoke_batch(self, prompts: list, system_prompt: str = None, max_workers: int = 4,
+                     return_exceptions: bool = False) -> list:
+        """
+        Invoke the model for several prompts concurrently
+        
+        Args:
+            prompts: User prompts to send (one request each)
+            system_prompt: System instructions shared by every prompt
+            max_workers: Maximum number of concurrent requests
+            return_exceptions: Return failures in place of responses instead of raising
+        
+        Returns:
+            Responses in the same order as prompts
+        """
+        if not prompts:
+            return []
+        
+        def call(prompt):
+            try:
+                return self.invoke(prompt, system_prompt=system_prompt)
+            except Exception as e:
+                if return_exceptions:
+                    return e
+                raise
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(prompts))) as executor:
+            return list(executor.map(call, prompts))
 
 
 class OllamaResponse:
     """
     Response wrapper to match expected interface
     """
+    __slots__ = ("content",)
+    
     def __init__(self, content):
         self.content = content
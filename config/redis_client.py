@@ -0,0 +1,38 @@
+"""
+Optional Redis client for caches shared across API workers
+"""
+from functools import lru_cache
+from config.config import get_settings
+
+@lru_cache()
+def get_redis_client():
+    """Get cached async Redis client, or None when REDIS_URL is unset or redis is not installed"""
+    settings = get_settings()
+    
+    if not settings.redis_url:
+        return None
+    
+    try:
+        import redis.asyncio as redis
+    except ImportError:
+        print("REDIS_URL is set but the redis package is not installed; caching disabled")
+        return None
+    
+    # Raw bytes in and out: cached values are orjson payloads served as-is
+    return redis.from_url(settings.redis_url, decode_responses=False)
+
+@lru_cache()
+def get_sync_redis_client():
+    """Get cached blocking Redis client for synchronous callers, or None when Redis is not configured"""
+    settings = get_settings()
+    
+    if not settings.redis_url:
+        return None
+    
+    try:
+        import redis
+    except ImportError:
+        print("REDIS_URL is set but the redis package is not installed; caching disabled")
+        return None
+    
+    return redis.Redis.from_url(settings.redis_url, decode_responses=False)
@@ -2,50 +2,70 @@
 Launch script for the AI Research Agent with Chatbot
 Starts both the API server and Streamlit chat interface
 """
-import subprocess
+import asyncio
 import sys
 import time
+import urllib.request
 import webbrowser
+from importlib.metadata import distribution, PackageNotFoundError
 from pathlib import Path
 
-def start_api_server():
+API_HEALTH_URL = "http://localhost:8000/health"
+STREAMLIT_HEALTH_PATH = "/_stcore/health"
+
+async def start_api_server():
     """Start the FastAPI server"""
     print("🚀 Starting API server...")
-    api_process = subprocess.Popen([
+    return await asyncio.create_subprocess_exec(
         sys.executable, "-m", "uvicorn", 
-        "main:app", 
+        "app.app:create_app", 
+        "--factory",
         "--reload", 
         "--port", "8000",
         "--host", "0.0.0.0"
-    ])
-    return api_process
+    )
 
-def start_streamlit_chatbot():
+async def start_streamlit_chatbot():
     """Start the Streamlit chatbot interface"""
     print("🤖 Starting Streamlit chatbot interface...")
-    streamlit_process = subprocess.Popen([
+    return await asyncio.create_subprocess_exec(
         sys.executable, "-m", "streamlit", 
         "run", 
         "streamlit_chatbot.py",
         "--server.port", "8502",
         "--server.address", "0.0.0.0"
-    ])
-    return streamlit_process
+    )
 
-def start_streamlit_main():
+async def start_streamlit_main():
     """Start the main Streamlit interface"""
     print("📊 Starting main Streamlit interface...")
-    streamlit_process = subprocess.Popen([
+    return await asyncio.create_subprocess_exec(
         sys.executable, "-m", "streamlit", 
         "run", 
         "streamlit_app.py",
         "--server.port", "8501",
         "--server.address", "0.0.0.0"
-    ])
-    return streamlit_process
+    )
+
+def _probe(url: str) -> bool:
+    """Return True if the URL answers with HTTP 200"""
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return response.status == 200
+    except OSError:
+        return False
+
+async def wait_until_ready(url: str, timeout: float = 60.0, interval: float = 0.05) -> bool:
+    """Poll a health endpoint until it responds or the timeout expires"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if await asyncio.to_thread(_probe, url):
+            return True
+        await asyncio.sleep(interval)
+    return False
 
 def check_requirements():
-    """Check if required packages are installed"""
+    """Check if required packages are installed (metadata lookup only, nothing is imported)"""
     required_packages = [
         "fastapi", "uvicorn", "streamlit", "requests", 
         "pydantic", "langchain-core", "supabase"
@@ -54,8 +74,8 @@ def check_requirements():
     missing_packages = []
     for package in required_packages:
         try:
-            __import__(package.replace("-", "_"))
-        except ImportError:
+            distribution(package)
+        except PackageNotFoundError:
             missing_packages.append(package)
     
     if missing_packages:
@@ -66,37 +86,55 @@ def check_requirements():
     print("✅ All required packages are installed")
     return True
 
-def main():
-    """Main launcher function"""
-    print("🔬 AI Research Agent Launcher")
-    print("=" * 40)
-    
-    # Check requirements
-    if not check_requirements():
-        sys.exit(1)
-    
-    print("\nChoose launch mode:")
-    print("1. 🤖 Chatbot interface only (recommended)")
-    print("2. 📊 Main interface only")
-    print("3. 🚀 Both interfaces")
-    print("4. 🔧 API server only")
-    
-    choice = input("\nEnter choice (1-4): ").strip()
+async def supervise(processes):
+    """Block until the first service exits, without polling"""
+    waiters = {asyncio.create_task(process.wait()): name for name, process in processes}
+    done, pending = await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+    for task in pending:
+        task.cancel()
+    for task in done:
+        print(f"❌ {waiters[task]} process stopped unexpectedly")
+
+async def stop_services(processes):
+    """Terminate all running services, killing any that do not exit in time"""
+    print("\n🛑 Stopping all services...")
+    for name, process in processes:
+        if process.returncode is not None:
+            continue
+        print(f"   Stopping {name}...")
+        process.terminate()
+        try:
+            await asyncio.wait_for(process.wait(), timeout=5)
+        except asyncio.TimeoutError:
+            process.kill()
     
+    print("✅ All services stopped")
+
+async def open_when_ready(url: str, health_url: str):
+    """Open a browser tab once the service behind it is healthy"""
+    if await wait_until_ready(health_url):
+        webbrowser.open(url)
+
+async def run_services(choice: str):
+    """Start the chosen services and supervise them until one exits"""
     processes = []
+    # Browser tabs open in the background so supervision starts right away
+    browser_tasks = []
     
     try:
         # Always start API server
-        api_process = start_api_server()
+        api_process = await start_api_server()
         processes.append(("API Server", api_process))
         
         # Wait for API to start
         print("⏳ Waiting for API server to start...")
-        time.sleep(3)
+        if not await wait_until_ready(API_HEALTH_URL):
+            print("❌ API server did not become healthy in time")
+            return
         
         if choice == "1":
             # Chatbot only
-            chatbot_process = start_streamlit_chatbot()
+            chatbot_process = await start_streamlit_chatbot()
             processes.append(("Chatbot", chatbot_process))
             
             print("\n✅ Services started successfully!")
@@ -104,12 +142,13 @@ def main():
             print("🔧 API documentation: http://localhost:8000/docs")
             
             # Open chatbot in browser
-            time.sleep(2)
-            webbrowser.open("http://localhost:8502")
+            browser_tasks.append(asyncio.create_task(
+                open_when_ready("http://localhost:8502", "http://localhost:8502" + STREAMLIT_HEALTH_PATH)
+            ))
             
         elif choice == "2":
             # Main interface only
-            main_process = start_streamlit_main()
+            main_process = await start_streamlit_main()
             processes.append(("Main Interface", main_process))
             
             print("\n✅ Services started successfully!")
@@ -117,13 +156,14 @@ def main():
             print("🔧 API documentation: http://localhost:8000/docs")
             
             # Open main interface in browser
-            time.sleep(2)
-            webbrowser.open("http://localhost:8501")
+            browser_tasks.append(asyncio.create_task(
+                open_when_ready("http://localhost:8501", "http://localhost:8501" + STREAMLIT_HEALTH_PATH)
+            ))
             
         elif choice == "3":
             # Both interfaces
-            chatbot_process = start_streamlit_chatbot()
-            main_process = start_streamlit_main()
+            chatbot_process = await start_streamlit_chatbot()
+            main_process = await start_streamlit_main()
             processes.append(("Chatbot", chatbot_process))
             processes.append(("Main Interface", main_process))
             
@@ -133,10 +173,10 @@ def main():
             print("🔧 API documentation: http://localhost:8000/docs")
             
             # Open both interfaces
-            time.sleep(2)
-            webbrowser.open("http://localhost:8502")
-            time.sleep(1)
-            webbrowser.open("http://localhost:8501")
+            browser_tasks += [
+                asyncio.create_task(open_when_ready("http://localhost:8502", "http://localhost:8502" + STREAMLIT_HEALTH_PATH)),
+                asyncio.create_task(open_when_ready("http://localhost:8501", "http://localhost:8501" + STREAMLIT_HEALTH_PATH))
+            ]
             
         elif choice == "4":
             # API only
@@ -145,13 +185,7 @@ def main():
             print("🧪 Test endpoints: http://localhost:8000/health")
             
             # Open API docs
-            time.sleep(2)
             webbrowser.open("http://localhost:8000/docs")
-            
-        else:
-            print("❌ Invalid choice")
-            api_process.terminate()
-            sys.exit(1)
         
         print("\n" + "=" * 40)
         print("🎉 All services are running!")
@@ -159,30 +193,40 @@ def main():
         print("=" * 40)
         
         # Wait for processes
-        while True:
-            time.sleep(1)
-            # Check if any process has died
-            for name, process in processes:
-                if process.poll() is not None:
-                    print(f"❌ {name} process stopped unexpectedly")
-                    break
+        await supervise(processes)
     
-    except KeyboardInterrupt:
-        print("\n🛑 Stopping all services...")
-        for name, process in processes:
-            print(f"   Stopping {name}...")
-            process.terminate()
-            try:
-                process.wait(timeout=5)
-            except subprocess.TimeoutExpired:
-                process.kill()
-        
-        print("✅ All services stopped")
+    finally:
+        for task in browser_tasks:
+            task.cancel()
+        await stop_services(processes)
+
+def main():
+    """Main launcher function"""
+    print("🔬 AI Research Agent Launcher")
+    print("=" * 40)
+    
+    # Check requirements
+    if not check_requirements():
+        sys.exit(1)
     
+    print("\nChoose launch mode:")
+    print("1. 🤖 Chatbot interface only (recommended)")
+    print("2. 📊 Main interface only")
+    print("3. 🚀 Both interfaces")
+    print("4. 🔧 API server only")
+    
+    choice = input("\nEnter choice (1-4): ").strip()
+    
+    if choice not in ("1", "2", "3", "4"):
+        print("❌ Invalid choice")
+        sys.exit(1)
+    
+    try:
+        asyncio.run(run_services(choice))
+    except KeyboardInterrupt:
+        pass
     except Exception as e:
         print(f"❌ Error starting services: {e}")
-        for name, process in processes:
-            process.terminate()
         sys.exit(1)
 
 if __name__ == "__main__":
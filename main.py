@@ -8,12 +8,19 @@ def main():
     """Main entry point for the Research Agent API"""
     settings = get_settings()
     
+    # Reload and multiple workers are mutually exclusive; never reload in production
+    reload = settings.reload and settings.environment != "production"
+    
     uvicorn.run(
         "app.app:create_app",
         host=settings.host,
         port=settings.port,
-        reload=settings.reload,
-        factory=settings.factory
+        reload=reload,
+        factory=settings.factory,
+        # "auto" picks uvloop/httptools when installed and falls back to asyncio/h11 (e.g. on Windows)
+        loop="auto",
+        http="auto",
+        workers=None if reload else settings.workers
     )
 
 if __name__ == "__main__":
@@ -1,53 +1,93 @@
 """
 Unified Pydantic request/response models
 """
-from pydantic import BaseModel, Field, validator
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, ConfigDict, Field, StringConstraints, computed_field, field_validator
+from typing import Annotated, List, Optional, Dict, Any, Tuple
 from datetime import datetime
+import os
+import sys
+import threading
 import uuid
 
-# Core workflow models
+# Batched ID generation: one os.urandom syscall per 256 IDs instead of one per ID
+_ID_BYTES = 16
+_ID_BATCH = 256
+_id_lock = threading.Lock()
+_id_pool = b""
+_id_offset = 0
+
+def _reset_id_pool() -> None:
+    """Drop buffered randomness so forked processes never hand out the parent's IDs"""
+    global _id_pool, _id_offset
+    _id_pool = b""
+    _id_offset = 0
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_id_pool)
+
+def _next_id() -> str:
+    """Return a random (version 4) UUID string drawn from a pre-fetched entropy pool"""
+    global _id_pool, _id_offset
+    with _id_lock:
+        if _id_offset >= len(_id_pool):
+            _id_pool = os.urandom(_ID_BYTES * _ID_BATCH)
+            _id_offset = 0
+        raw = _id_pool[_id_offset:_id_offset + _ID_BYTES]
+        _id_offset += _ID_BYTES
+    return str(uuid.UUID(bytes=raw, version=4))
+
+# Core workflow models are immutable value objects; validation stays in pydantic-core
+CORE_MODEL_CONFIG = ConfigDict(frozen=True, extra='forbid', validate_assignment=False)
+
+NonEmptyStr = Annotated[str, StringConstraints(min_length=1, strip_whitespace=True)]
+
 class ProjectInfo(BaseModel):
-    title: str
-    description: str
+    model_config = CORE_MODEL_CONFIG
+
+    title: NonEmptyStr
+    description: NonEmptyStr
     area_of_study: Optional[str] = None
     geography: Optional[str] = None
 
-    @validator("title", "description")
-    def non_empty(cls, v):
-        if not v.strip():
-            raise ValueError("Cannot be empty")
-        return v.strip()
-
 class ResearchQuestion(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    model_config = CORE_MODEL_CONFIG
+
+    id: str = Field(default_factory=_next_id)
     text: str
     question_type: str
     parent_question_id: Optional[str] = None
 
 class SubQuestionMap(BaseModel):
+    model_config = CORE_MODEL_CONFIG
+
     sub_question_id: str
     sub_question: str
     data_requirements: str
     analysis_approach: str
 
 class ResearchVariable(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    model_config = CORE_MODEL_CONFIG
+
+    id: str = Field(default_factory=_next_id)
     name: str
     description: Optional[str] = None
     sub_question_id: str
 
 class DataGap(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    model_config = CORE_MODEL_CONFIG
+
+    id: str = Field(default_factory=_next_id)
     missing_variable: str
     gap_description: str
     suggested_sources: str
     sub_question_id: str
 
 class LiteratureReference(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    model_config = CORE_MODEL_CONFIG
+
+    id: str = Field(default_factory=_next_id)
     title: str
-    authors: List[str] = []
+    authors: Tuple[str, ...] = ()
     abstract: str = ""
     year: Optional[int] = None
     venue: str = ""
@@ -58,15 +98,25 @@ class LiteratureReference(BaseModel):
     hierarchy_rank: Optional[int] = None  # 1 = primary/most relevant, 2+ = supporting
     is_primary: bool = False  # True for highest scoring paper
 
+    @field_validator("authors")
+    @classmethod
+    def intern_authors(cls, v):
+        # Authors recur across many references; share one string object per name
+        return tuple(sys.intern(author) for author in v)
+
 class HierarchicalLiterature(BaseModel):
     """Hierarchical literature structure with primary and supporting papers"""
     sub_question_id: str
     sub_question_text: str
     primary_paper: Optional[LiteratureReference] = None  # Highest relevance score
     supporting_papers: List[LiteratureReference] = []  # Rest in descending order
-    total_papers: int = 0
     max_relevance_score: float = 0.0
 
+    @computed_field
+    @property
+    def total_papers(self) -> int:
+        return len(self.supporting_papers) + (1 if self.primary_paper else 0)
+
 # Database Schema Models
 class DatabaseColumn(BaseModel):
     name: str
@@ -80,24 +130,36 @@ class DatabaseTable(BaseModel):
     name: str
     description: str
     columns: List[DatabaseColumn]
-    column_count: int
+
+    @computed_field
+    @property
+    def column_count(self) -> int:
+        return len(self.columns)
 
 class DatabaseSchemaResponse(BaseModel):
     database_name: str
     version: str
     description: str
     tables: List[DatabaseTable]
-    total_tables: int
     last_updated: str
 
+    @computed_field
+    @property
+    def total_tables(self) -> int:
+        return len(self.tables)
+
 class TableDetailsResponse(BaseModel):
     table_name: str
     description: str
     columns: List[DatabaseColumn]
-    total_columns: int
     primary_keys: List[str]
     foreign_keys: List[str]
 
+    @computed_field
+    @property
+    def total_columns(self) -> int:
+        return len(self.columns)
+
 # Request Models
 class ProjectRequest(BaseModel):
     title: str
@@ -1,30 +1,16 @@
 """
 Enhanced LLM prompt templates
 """
+import sys
+from typing import Final
 
-PROMPT_STEP2 = """You are an expert research designer. 
+PROMPT_STEP2: Final[str] = sys.intern("""You are an expert research designer. 
 Given the project information, generate:
 1. Between 3 to 5 main research questions that are specific, measurable, and relevant to the research topic.
 2. A list of 3-5 related sub-questions for each main questions.
 
-Format your response as plain text like this:
-MAIN QUESTION 1:
-[Main research question here]
-
-SUB-QUESTIONS:
-- [First sub-question]
-- [Second sub-question]
-- [Third sub-question]
-
-MAIN QUESTION 2:
-[Main research question here]
-
-SUB-QUESTIONS:
-- [First sub-question]
-- [Second sub-question]
-- [Third sub-question]
-
-MAIN QUESTION 3:
+Format your response as plain text, using this block for each main question (N = 1, 2, 3, ...):
+MAIN QUESTION N:
 [Main research question here]
 
 SUB-QUESTIONS:
@@ -32,24 +18,8 @@ SUB-QUESTIONS:
 - [Second sub-question]
 - [Third sub-question]
 
-MAIN QUESTION 4:
-[Main research question here]
-
-SUB-QUESTIONS:
-- [First sub-question]
-- [Second sub-question]
-- [Third sub-question]
-
-MAIN QUESTION 5:
-[Main research question here]
-
-SUB-QUESTIONS:
-- [First sub-question]
-- [Second sub-question]
-- [Third sub-question]
-
-All main questions and sub-questions should be different from each other.
-"""
+Repeat the block for every main question. All main questions and sub-questions should be different from each other.
+""")
 
 PROMPT_STEP3 = """You are a research methods specialist.
 For each sub-question, provide:
@@ -1,7 +1,9 @@
 """
 Agent state definitions
 """
-from typing import List, Optional, Dict, Any, TypedDict
+from dataclasses import dataclass
+from typing import List, Optional, Dict, Any, FrozenSet, TypedDict
+import numpy as np
 from model.models import ResearchQuestion, SubQuestionMap, ResearchVariable, DataGap, LiteratureReference
 
 class AgentState(TypedDict):
@@ -13,6 +15,42 @@ class AgentState(TypedDict):
     research_variables: List[ResearchVariable]
     data_gaps: List[DataGap]
     literature: Dict[str, List[LiteratureReference]]  # key: sub_question_id
-    selected_main_question_ids: Optional[List[str]]  # IDs of selected main questions
+    selected_main_question_ids: Optional[FrozenSet[str]]  # IDs of selected main questions (O(1) membership)
     questions_filtered: Optional[bool]  # Flag to indicate if questions have been filtered
     sub_question_answers: Optional[List[Dict[str, Any]]]  # Answers to sub-questions
+
+@dataclass
+class LiteratureTable:
+    """
+    Columnar (struct-of-arrays) view over the literature in AgentState.
+    LiteratureReference stays the boundary/serialization type; filters and
+    sorts run on the numpy columns instead of scanning Python objects.
+    """
+    references: List[LiteratureReference]
+    sub_question_order: List[str]  # Original sub-question key order
+    relevance: np.ndarray  # float32
+    sub_question_codes: np.ndarray  # int32 index into sub_question_order
+
+    @classmethod
+    def from_literature(cls, literature: Dict[str, List[LiteratureReference]]) -> "LiteratureTable":
+        """Build the columnar table from a sub_question_id -> references mapping"""
+        sub_question_order = list(literature.keys())
+        references = [paper for papers in literature.values() for paper in papers]
+        codes = [code for code, papers in enumerate(literature.values()) for _ in papers]
+        
+        return cls(
+            references=references,
+            sub_question_order=sub_question_order,
+            relevance=np.fromiter((paper.relevance for paper in references), dtype=np.float32, count=len(references)),
+            sub_question_codes=np.asarray(codes, dtype=np.int32)
+        )
+
+    def by_sub_question(self) -> Dict[str, List[LiteratureReference]]:
+        """Group references per sub-question, most relevant first"""
+        grouped = {sub_question_id: [] for sub_question_id in self.sub_question_order}
+        
+        # Sort by sub-question, then by descending relevance, in one vectorized pass
+        order = np.lexsort((-self.relevance, self.sub_question_codes))
+        for index in order.tolist():
+            grouped[self.sub_question_order[self.sub_question_codes[index]]].append(self.references[index])
+        return grouped
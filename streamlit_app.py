@@ -4,10 +4,12 @@ A user-friendly web interface to interact with the research workflow
 """
 
 import streamlit as st
-import requests
-import json
+import csv
+import html
+import io
+import orjson
+from contextlib import contextmanager
 from typing import Dict, Any, List
-import pandas as pd
 from datetime import datetime
 
 # Configure Streamlit page
@@ -18,52 +20,177 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Sidebar step indicator colours (match st.success / st.info)
+STEP_DONE_BG = "rgba(33, 195, 84, 0.1)"
+STEP_PENDING_BG = "rgba(28, 131, 225, 0.1)"
+
 # API Configuration
 API_BASE_URL = "http://localhost:8000/api"
+# (connect, read) timeout in seconds; reads are long because workflow steps wait on the LLM
+API_TIMEOUT = (3, 300)
 
 # Initialize session state for systematic workflow
-if 'session_id' not in st.session_state:
-    st.session_state.session_id = None
-if 'current_tab' not in st.session_state:
-    st.session_state.current_tab = 0
-if 'project_created' not in st.session_state:
-    st.session_state.project_created = False
-if 'questions_generated' not in st.session_state:
-    st.session_state.questions_generated = False
-if 'questions_analyzed' not in st.session_state:
-    st.session_state.questions_analyzed = False
-if 'data_gaps_identified' not in st.session_state:
-    st.session_state.data_gaps_identified = False
-if 'literature_searched' not in st.session_state:
-    st.session_state.literature_searched = False
-if 'main_question_ids' not in st.session_state:
-    st.session_state.main_question_ids = []
-if 'questions_data' not in st.session_state:
-    st.session_state.questions_data = None
-if 'analysis_results' not in st.session_state:
-    st.session_state.analysis_results = None
-if 'data_gaps_results' not in st.session_state:
-    st.session_state.data_gaps_results = None
-if 'literature_results' not in st.session_state:
-    st.session_state.literature_results = None
+_DEFAULTS = (
+    ('session_id', None),
+    ('current_tab', 0),
+    ('project_created', False),
+    ('questions_generated', False),
+    ('questions_analyzed', False),
+    ('data_gaps_identified', False),
+    ('literature_searched', False),
+    ('main_question_ids', []),
+    ('main_q_by_id', {}),
+    ('questions_data', None),
+    ('analysis_results', None),
+    ('analysis_preview', ()),
+    ('data_gaps_results', None),
+    ('literature_results', None),
+    ('literature_sorted', None),
+)
+# Workflow keys cleared by "Reset Workflow" (navigation state is kept)
+_RESET_KEYS = frozenset(key for key, _ in _DEFAULTS) - {'current_tab'}
+
+for key, default in _DEFAULTS:
+    # Copy mutable defaults so sessions never share a container
+    st.session_state.setdefault(key, type(default)(default) if isinstance(default, (list, dict)) else default)
+
+@st.cache_resource
+def _requests():
+    """Import requests on the first API call instead of at app start"""
+    import requests
+    return requests
+
+@st.cache_resource
+def get_http_session():
+    """Shared keep-alive HTTP session so workflow steps reuse connections to the API"""
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    
+    session = _requests().Session()
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=8,
+        max_retries=Retry(total=2, backoff_factor=0.2)
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    # Literature responses carry full abstracts; ask for them compressed
+    session.headers.update({"Accept-Encoding": "gzip"})
+    return session
+
+def _raw_request(endpoint: str, method: str = "POST", data: Dict = None):
+    """Send a request to the API and return the decoded JSON body (raises on failure)"""
+    url = f"{API_BASE_URL}/{endpoint}"
+    session = get_http_session()
+    
+    if method == "POST":
+        headers = {"Content-Type": "application/json"}
+        response = session.post(url, data=orjson.dumps(data), headers=headers, timeout=API_TIMEOUT)
+    else:
+        response = session.get(url, timeout=API_TIMEOUT)
+        
+    response.raise_for_status()
+    return orjson.loads(response.content)
 
 def make_api_request(endpoint: str, method: str = "POST", data: Dict = None) -> Dict:
     """Make API request with error handling"""
     try:
-        url = f"{API_BASE_URL}/{endpoint}"
-        
-        if method == "POST":
-            response = requests.post(url, json=data)
-        else:
-            response = requests.get(url)
-            
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
+        return _raw_request(endpoint, method, data)
+    except _requests().exceptions.RequestException as e:
         st.error(f"API Error: {str(e)}")
         if hasattr(e, 'response') and e.response:
             st.error(f"Response: {e.response.text}")
         return None
+    except orjson.JSONDecodeError as e:
+        st.error(f"API Error: invalid JSON response ({e})")
+        return None
+
+def _mark_in_flight(step: str):
+    # on_click callbacks run before the rerun, so the button is already disabled when the step starts
+    st.session_state[f"_inflight_{step}"] = True
+
+def step_button(label: str, step: str, **kwargs) -> bool:
+    """Button that stays disabled from its click until the step finishes, so a double click can't resend"""
+    flag = f"_inflight_{step}"
+    clicked = st.button(
+        label,
+        disabled=st.session_state.get(flag, False),
+        on_click=_mark_in_flight,
+        args=(step,),
+        **kwargs
+    )
+    if not clicked and st.session_state.get(flag):
+        # The run that owned the step was interrupted before finishing; re-enable on the next rerun
+        st.session_state[flag] = False
+    return clicked
+
+@contextmanager
+def in_flight(step: str):
+    """Run a workflow step started by step_button, re-enabling its button once it finishes"""
+    try:
+        yield
+    finally:
+        st.session_state[f"_inflight_{step}"] = False
+
+def sort_literature(literature: Dict[str, List[Dict]]) -> Dict[str, List[Dict]]:
+    """Sort each sub-question's papers by relevance once, with the author list pre-joined for display"""
+    return {
+        sub_q_id: sorted(
+            ({**paper, 'authors_text': ', '.join(paper.get('authors') or [])} for paper in papers),
+            key=lambda paper: paper.get('relevance', 0),
+            reverse=True
+        )
+        for sub_q_id, papers in literature.items()
+    }
+
+def secondary_paper_card(rank: int, paper: Dict) -> str:
+    """Collapsible HTML card for a supporting paper (all paper text is escaped)"""
+    title = html.escape(paper.get('title', 'Unknown'))
+    authors_text = paper.get('authors_text', '')
+    abstract = paper.get('abstract', '')
+    url = paper.get('url', '')
+    
+    parts = [f"<details><summary>Reference #{rank}: {html.escape(paper.get('title', 'Unknown')[:60])}...</summary><b>{title}</b><br>"]
+    if authors_text:
+        parts.append(f"<b>Authors:</b> {html.escape(authors_text)}<br>")
+    parts.append(
+        f"<b>Year:</b> {html.escape(str(paper.get('year', 'Unknown')))} | "
+        f"<b>Venue:</b> {html.escape(str(paper.get('venue', 'Unknown')))}<br>"
+    )
+    if abstract:
+        parts.append(f"<b>Abstract:</b> {html.escape(abstract[:200])}...<br>")
+    parts.append(
+        f"<b>Score:</b> {paper.get('relevance', 0):.3f} | "
+        f"<b>Tier:</b> {html.escape(paper.get('confidence_tier', 'Unknown').title())}"
+    )
+    if url:
+        parts.append(f' | <a href="{html.escape(url, quote=True)}" target="_blank">🔗 View</a>')
+    parts.append("</details>")
+    return "".join(parts)
+
+def stream_literature_search(session_id: str, literature: Dict, status: Dict):
+    """Yield progress lines as per-sub-question literature results stream in (fills literature/status in place)"""
+    url = f"{API_BASE_URL}/search-literature-analyzed/stream"
+    # Uncompressed so each NDJSON line is delivered as soon as the server yields it
+    headers = {"Accept-Encoding": "identity"}
+    try:
+        with get_http_session().post(url, json={"session_id": session_id}, headers=headers, stream=True, timeout=API_TIMEOUT) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                event = orjson.loads(line)
+                if "error" in event:
+                    status["error"] = event["error"]
+                    return
+                if event.get("done"):
+                    status.update(event)
+                    return
+                papers = event.get("papers", [])
+                literature[event["sub_question_id"]] = papers
+                yield f"📖 Found {len(papers)} paper(s) for sub-question {event['sub_question_id'][:8]}...\n\n"
+    except _requests().exceptions.RequestException as e:
+        status["error"] = f"API Error: {str(e)}"
 
 def navigate_to_tab(tab_index: int):
     """Navigate to a specific tab"""
@@ -106,12 +233,107 @@ def create_navigation_buttons(current_step: int, total_steps: int = 5):
             else:
                 st.button("Complete Current Step First", key=f"next_disabled_{current_step}", disabled=True)
 
-# Main App Layout
-st.title("🔬 AI Research Agent")
-st.markdown("*Systematic research workflow with complete API integration*")
+@st.cache_data(show_spinner=False)
+def build_subq_preview(question_id: str, question_number: int, sub_questions: tuple) -> List[str]:
+    """Sub-question preview lines for a main question, built once per question"""
+    return [f"{question_number}.{j}) {text}" for j, (_, text) in enumerate(sub_questions, 1)]
 
-# Sidebar - Workflow Status
-with st.sidebar:
+@st.fragment
+def render_question_selection(main_questions: List[Dict[str, Any]]):
+    """Question selection UI; checkbox changes rerun only this fragment"""
+    selected_question_ids = []
+    
+    # Create checkboxes for each main question
+    for i, mq in enumerate(main_questions, 1):
+        question_text = mq.get('text', 'Unknown')
+        question_id = mq.get('id', 'Unknown')
+        
+        # Display question with preview of sub-questions
+        with st.container():
+            col1, col2 = st.columns([1, 4])
+            
+            with col1:
+                selected = st.checkbox(
+                    f"Q{i}",
+                    key=f"select_main_{question_id}",
+                    help=f"Select Question {i}"
+                )
+                if selected:
+                    selected_question_ids.append(question_id)
+            
+            with col2:
+                st.write(f"**Question {i}:** {question_text}")
+                
+                # Show sub-questions preview
+                sub_questions = mq.get("sub_questions", [])
+                if sub_questions:
+                    with st.expander(f"📋 View {len(sub_questions)} sub-questions"):
+                        preview = build_subq_preview(
+                            question_id,
+                            i,
+                            tuple((sq.get('id', ''), sq.get('text', 'Unknown')) for sq in sub_questions)
+                        )
+                        st.markdown("  \n".join(preview))
+        
+        st.divider()
+    
+    # Validation and analysis
+    if len(selected_question_ids) > 2:
+        st.error("❌ **Error: You can select maximum 2 questions.** Please uncheck some questions.")
+        st.warning(f"Currently selected: {len(selected_question_ids)} questions")
+    elif len(selected_question_ids) == 0:
+        st.info("👆 Please select at least 1 main question to proceed with analysis.")
+    else:
+        st.success(f"✅ Selected {len(selected_question_ids)} question(s) for analysis")
+        
+        # Show selected questions summary
+        with st.expander("📝 Selected Questions Summary", expanded=True):
+            for q_id in selected_question_ids:
+                selected_q = st.session_state.main_q_by_id.get(q_id)
+                if selected_q:
+                    st.write(f"✓ **{selected_q.get('text', 'Unknown')}**")
+        
+        # Analysis button (only enabled when 1-2 questions selected)
+        if st.button("🔍 Analyze Selected Sub-Questions", type="primary", help="Analyze sub-questions for selected main questions"):
+            with st.spinner("Analyzing sub-questions and mapping data requirements..."):
+                analyze_data = {
+                    "session_id": st.session_state.session_id,
+                    "main_question_ids": selected_question_ids
+                }
+                result = make_api_request("analyze-subquestions", data=analyze_data)
+                
+                if result:
+                    st.session_state.questions_analyzed = True
+                    st.session_state.analysis_results = result  # Store the results
+                    # Truncated preview rows are computed once here rather than on every render
+                    st.session_state.analysis_preview = tuple(
+                        (
+                            m.get('sub_question', 'Unknown')[:50],
+                            m.get('data_requirements', 'None specified')[:100],
+                            m.get('analysis_approach', 'None specified')[:100]
+                        )
+                        for m in result[:3]
+                    )
+                    st.success("✅ Sub-questions analyzed successfully!")
+                    
+                    # Display analysis results preview
+                    st.subheader("📋 Analysis Results Preview")
+                    st.info(f"✅ Successfully analyzed {len(result)} sub-questions")
+                    
+                    for i, (sub_question, data_requirements, analysis_approach) in enumerate(st.session_state.analysis_preview, 1):  # Show first 3 as preview
+                        with st.expander(f"📝 Sub-question {i}: {sub_question}...", expanded=False):
+                            st.write(f"**Data Requirements:** {data_requirements}...")
+                            st.write(f"**Analysis Approach:** {analysis_approach}...")
+                    
+                    if len(result) > 3:
+                        st.info(f"+ {len(result) - 3} more sub-questions analyzed. View full details in the Sub-question Analysis tab.")
+                    
+                    st.info("**Next Step:** Go to Sub-question Analysis tab to see complete results")
+                    # Full-app rerun (not just this fragment) so other tabs and the sidebar pick up the results
+                    st.rerun(scope="app")
+
+def render_sidebar():
+    """Workflow status and quick actions (rendered after the tabs so step changes show in the same run)"""
     st.header("📋 Systematic Workflow")
     
     # Status indicators
@@ -131,32 +353,31 @@ with st.sidebar:
         ("📚 Search Literature", st.session_state.literature_searched)
     ]
     
-    for step_name, completed in steps:
-        if completed:
-            st.success(f"{step_name} ✅")
-        else:
-            st.info(f"{step_name} ⏳")
+    # Render all step indicators as one markdown element instead of one per step
+    st.markdown(
+        "".join(
+            f'<div style="padding:0.5rem 0.75rem;margin-bottom:0.5rem;border-radius:0.5rem;'
+            f'background-color:{STEP_DONE_BG if completed else STEP_PENDING_BG};">'
+            f'{step_name} {"✅" if completed else "⏳"}</div>'
+            for step_name, completed in steps
+        ),
+        unsafe_allow_html=True
+    )
     
     st.markdown("---")
     
     # Quick actions
     if st.button("🔄 Reset Workflow"):
-        for key in ['session_id', 'project_created', 'questions_generated', 'questions_analyzed', 'data_gaps_identified', 'literature_searched', 'main_question_ids', 'questions_data', 'analysis_results', 'data_gaps_results', 'literature_results']:
-            if key == 'session_id':
-                st.session_state[key] = None
-            elif key in ['main_question_ids']:
-                st.session_state[key] = []
-            elif key in ['questions_data', 'analysis_results', 'data_gaps_results', 'literature_results']:
-                st.session_state[key] = None
-            else:
-                st.session_state[key] = False
+        st.session_state.update({
+            key: type(default)(default) if isinstance(default, (list, dict)) else default
+            for key, default in _DEFAULTS
+            if key in _RESET_KEYS
+        })
+        # The tabs have already rendered with the old state by this point
         st.rerun()
 
-# Main Content Tabs
-tab1, tab2, tab3, tab4, tab5 = st.tabs(["🎯 Project Setup", "❓ Research Questions", "📋 Sub-question Analysis", "⚠️ Data Gaps", "📚 Literature Search"])
-
-# Tab 1: Project Setup
-with tab1:
+def render_tab1():
+    """Step 1: project form that creates the session and generates questions"""
     st.header("🎯 Project Information")
     st.markdown("**Step 1:** Define your research project to start the systematic workflow")
     
@@ -200,398 +421,364 @@ with tab1:
                         # Extract main question IDs for later use
                         main_questions = result.get("main_questions", [])
                         st.session_state.main_question_ids = [q.get("id") for q in main_questions if q.get("id")]
+                        st.session_state.main_q_by_id = {q["id"]: q for q in main_questions if q.get("id")}
                         
                         st.success("✅ Project created and questions generated!")
                         st.info("**Next Step:** Go to Research Questions tab")
-                        st.rerun()
 
-# Tab 2: Research Questions  
-with tab2:
+def render_tab2():
+    """Step 2: main question selection and sub-question analysis"""
     st.header("❓ Research Questions")
     st.markdown("**Step 2:** Select main questions (max 2) and analyze sub-questions")
     
     if not st.session_state.session_id:
         st.warning("⚠️ Please create a project first in the Project Setup tab")
+        return
+    
+    st.success("✅ Questions generated! Select up to 2 main questions to analyze.")
+    
+    # Display generated questions for selection
+    if st.session_state.questions_data:
+        st.subheader("🎯 Select Main Questions to Analyze")
+        st.info("💡 **Select maximum 2 questions** for focused, high-quality analysis")
+        
+        render_question_selection(st.session_state.questions_data.get("main_questions", []))
     else:
-        st.success("✅ Questions generated! Select up to 2 main questions to analyze.")
+        st.warning("No questions data found. Please regenerate questions in Project Setup.")
+
+def render_tab3():
+    """Step 3: analysis results and data gap identification"""
+    st.header("📋 Sub-question Analysis")
+    st.markdown("**Step 3:** Review analysis results and identify data gaps")
+    
+    if not st.session_state.questions_analyzed:
+        st.warning("⚠️ Please analyze sub-questions first in the Research Questions tab")
+        return
+    
+    st.success("✅ Sub-questions analyzed! Review the analysis below.")
+    
+    # Display stored analysis results
+    if st.session_state.analysis_results:
+        st.subheader("📊 Analysis Results Overview")
+        st.info(f"📈 **Total Sub-questions Analyzed:** {len(st.session_state.analysis_results)}")
         
-        # Display generated questions for selection
-        if st.session_state.questions_data:
-            st.subheader("🎯 Select Main Questions to Analyze")
-            st.info("💡 **Select maximum 2 questions** for focused, high-quality analysis")
-            
-            main_questions = st.session_state.questions_data.get("main_questions", [])
-            selected_question_ids = []
-            
-            # Create checkboxes for each main question
-            for i, mq in enumerate(main_questions, 1):
-                question_text = mq.get('text', 'Unknown')
-                question_id = mq.get('id', 'Unknown')
+        for i, mapping in enumerate(st.session_state.analysis_results, 1):
+            with st.expander(f"📝 Sub-question {i}: {mapping.get('sub_question', 'Unknown')}", expanded=True):
+                col1, col2 = st.columns(2)
                 
-                # Display question with preview of sub-questions
-                with st.container():
-                    col1, col2 = st.columns([1, 4])
-                    
-                    with col1:
-                        selected = st.checkbox(
-                            f"Q{i}",
-                            key=f"select_main_{question_id}",
-                            help=f"Select Question {i}"
-                        )
-                        if selected:
-                            selected_question_ids.append(question_id)
-                    
-                    with col2:
-                        st.write(f"**Question {i}:** {question_text}")
-                        
-                        # Show sub-questions preview
-                        sub_questions = mq.get("sub_questions", [])
-                        if sub_questions:
-                            with st.expander(f"📋 View {len(sub_questions)} sub-questions"):
-                                for j, sq in enumerate(sub_questions, 1):
-                                    st.write(f"  {i}.{j}) {sq.get('text', 'Unknown')}")
+                with col1:
+                    st.markdown("**📋 Data Requirements:**")
+                    st.write(mapping.get('data_requirements', 'None specified'))
                 
-                st.divider()
+                with col2:
+                    st.markdown("**🔬 Analysis Approach:**")
+                    st.write(mapping.get('analysis_approach', 'None specified'))
+                
+                # Add mapping ID if available
+                if mapping.get('sub_question_id'):
+                    st.caption(f"Sub-question ID: {mapping.get('sub_question_id')}")
+    
+    st.divider()
+    
+    if step_button("⚡ Run Data Gaps + Literature Search", "workflow", help="Run the remaining steps together in a single request"):
+        with in_flight("workflow"), st.spinner("Identifying data gaps and searching literature in parallel... This may take a moment."):
+            result = make_api_request("run-workflow", data={"session_id": st.session_state.session_id})
             
-            # Validation and analysis
-            if len(selected_question_ids) > 2:
-                st.error("❌ **Error: You can select maximum 2 questions.** Please uncheck some questions.")
-                st.warning(f"Currently selected: {len(selected_question_ids)} questions")
-            elif len(selected_question_ids) == 0:
-                st.info("👆 Please select at least 1 main question to proceed with analysis.")
-            else:
-                st.success(f"✅ Selected {len(selected_question_ids)} question(s) for analysis")
+            if result:
+                # Store both steps' results in one shot
+                st.session_state.data_gaps_identified = True
+                st.session_state.data_gaps_results = result.get("data_gaps", [])
+                st.session_state.literature_searched = True
+                st.session_state.literature_results = result
+                st.session_state.literature_sorted = sort_literature(result.get("literature", {}))
+                st.success("✅ Data gaps identified and literature search completed!")
+    
+    if step_button("⚠️ Identify Data Gaps", "gaps", type="primary"):
+        with in_flight("gaps"), st.spinner("Identifying data gaps and missing requirements..."):
+            gap_data = {"session_id": st.session_state.session_id}
+            result = make_api_request("identify-data-gaps", data=gap_data)
+            
+            if result:
+                st.session_state.data_gaps_identified = True
+                st.session_state.data_gaps_results = result  # Store the results
+                st.success("✅ Data gaps identified!")
                 
-                # Show selected questions summary
-                with st.expander("📝 Selected Questions Summary", expanded=True):
-                    for q_id in selected_question_ids:
-                        selected_q = next((q for q in main_questions if q.get('id') == q_id), None)
-                        if selected_q:
-                            st.write(f"✓ **{selected_q.get('text', 'Unknown')}**")
+                # Display data gaps
+                st.subheader("⚠️ Identified Data Gaps")
+                if isinstance(result, list) and result:
+                    for gap in result:
+                        with st.container():
+                            st.warning(f"**Missing Variable:** {gap.get('missing_variable', 'Unknown')}")
+                            st.write(f"**Description:** {gap.get('gap_description', 'No description')}")
+                            st.write(f"**Suggested Sources:** {gap.get('suggested_sources', 'No suggestions')}")
+                            st.divider()
+                else:
+                    st.info("No significant data gaps identified.")
                 
-                # Analysis button (only enabled when 1-2 questions selected)
-                if st.button("🔍 Analyze Selected Sub-Questions", type="primary", help="Analyze sub-questions for selected main questions"):
-                    with st.spinner("Analyzing sub-questions and mapping data requirements..."):
-                        analyze_data = {
-                            "session_id": st.session_state.session_id,
-                            "main_question_ids": selected_question_ids
-                        }
-                        result = make_api_request("analyze-subquestions", data=analyze_data)
-                        
-                        if result:
-                            st.session_state.questions_analyzed = True
-                            st.session_state.analysis_results = result  # Store the results
-                            st.success("✅ Sub-questions analyzed successfully!")
-                            
-                            # Display analysis results preview
-                            st.subheader("📋 Analysis Results Preview")
-                            st.info(f"✅ Successfully analyzed {len(result)} sub-questions")
-                            
-                            for i, mapping in enumerate(result[:3], 1):  # Show first 3 as preview
-                                with st.expander(f"📝 Sub-question {i}: {mapping.get('sub_question', 'Unknown')[:50]}...", expanded=False):
-                                    st.write(f"**Data Requirements:** {mapping.get('data_requirements', 'None specified')[:100]}...")
-                                    st.write(f"**Analysis Approach:** {mapping.get('analysis_approach', 'None specified')[:100]}...")
-                            
-                            if len(result) > 3:
-                                st.info(f"+ {len(result) - 3} more sub-questions analyzed. View full details in the Sub-question Analysis tab.")
-                            
-                            st.info("**Next Step:** Go to Sub-question Analysis tab to see complete results")
-                            st.rerun()
-        else:
-            st.warning("No questions data found. Please regenerate questions in Project Setup.")
+                st.info("**Next Step:** Go to Data Gaps tab")
 
-# Tab 3: Sub-question Analysis
-with tab3:
-    st.header("📋 Sub-question Analysis")
-    st.markdown("**Step 3:** Review analysis results and identify data gaps")
+def render_tab4():
+    """Step 4: data gaps and literature search"""
+    st.header("⚠️ Data Gap Analysis")
+    st.markdown("**Step 4:** Review data gaps and search academic literature")
     
-    if not st.session_state.questions_analyzed:
-        st.warning("⚠️ Please analyze sub-questions first in the Research Questions tab")
-    else:
-        st.success("✅ Sub-questions analyzed! Review the analysis below.")
+    if not st.session_state.data_gaps_identified:
+        st.warning("⚠️ Please identify data gaps first in the Sub-question Analysis tab")
+        return
+    
+    st.success("✅ Data gaps identified! Review the gaps below.")
+    
+    # Display stored data gaps results
+    if st.session_state.data_gaps_results:
+        st.subheader("📊 Data Gaps Overview")
         
-        # Display stored analysis results
-        if st.session_state.analysis_results:
-            st.subheader("📊 Analysis Results Overview")
-            st.info(f"📈 **Total Sub-questions Analyzed:** {len(st.session_state.analysis_results)}")
+        if isinstance(st.session_state.data_gaps_results, list) and st.session_state.data_gaps_results:
+            st.error(f"⚠️ **Total Data Gaps Found:** {len(st.session_state.data_gaps_results)}")
             
-            for i, mapping in enumerate(st.session_state.analysis_results, 1):
-                with st.expander(f"📝 Sub-question {i}: {mapping.get('sub_question', 'Unknown')}", expanded=True):
+            for i, gap in enumerate(st.session_state.data_gaps_results, 1):
+                with st.expander(f"⚠️ Data Gap {i}: {gap.get('missing_variable', 'Unknown')}", expanded=True):
                     col1, col2 = st.columns(2)
                     
                     with col1:
-                        st.markdown("**📋 Data Requirements:**")
-                        st.write(mapping.get('data_requirements', 'None specified'))
+                        st.markdown("**📝 Gap Description:**")
+                        st.write(gap.get('gap_description', 'No description'))
                     
                     with col2:
-                        st.markdown("**🔬 Analysis Approach:**")
-                        st.write(mapping.get('analysis_approach', 'None specified'))
+                        st.markdown("**💡 Suggested Sources:**")
+                        st.write(gap.get('suggested_sources', 'No suggestions'))
                     
-                    # Add mapping ID if available
-                    if mapping.get('sub_question_id'):
-                        st.caption(f"Sub-question ID: {mapping.get('sub_question_id')}")
-        
-        st.divider()
-        
-        if st.button("⚠️ Identify Data Gaps", type="primary"):
-            with st.spinner("Identifying data gaps and missing requirements..."):
-                gap_data = {"session_id": st.session_state.session_id}
-                result = make_api_request("identify-data-gaps", data=gap_data)
-                
-                if result:
-                    st.session_state.data_gaps_identified = True
-                    st.session_state.data_gaps_results = result  # Store the results
-                    st.success("✅ Data gaps identified!")
+                    # Add gap metadata if available
+                    if gap.get('sub_question_id'):
+                        st.caption(f"Related to sub-question: {gap.get('sub_question_id')}")
                     
-                    # Display data gaps
-                    st.subheader("⚠️ Identified Data Gaps")
-                    if isinstance(result, list) and result:
-                        for gap in result:
-                            with st.container():
-                                st.warning(f"**Missing Variable:** {gap.get('missing_variable', 'Unknown')}")
-                                st.write(f"**Description:** {gap.get('gap_description', 'No description')}")
-                                st.write(f"**Suggested Sources:** {gap.get('suggested_sources', 'No suggestions')}")
-                                st.divider()
+                    # Severity indicator
+                    if 'critical' in gap.get('gap_description', '').lower():
+                        st.error("🚨 Critical Gap")
+                    elif 'important' in gap.get('gap_description', '').lower():
+                        st.warning("⚠️ Important Gap")
                     else:
-                        st.info("No significant data gaps identified.")
-                    
-                    st.info("**Next Step:** Go to Data Gaps tab")
-                    st.rerun()
-
-# Tab 4: Data Gaps
-with tab4:
-    st.header("⚠️ Data Gap Analysis")
-    st.markdown("**Step 4:** Review data gaps and search academic literature")
+                        st.info("ℹ️ Minor Gap")
+        else:
+            st.success("✅ **No significant data gaps identified!**")
+            st.info("Your research project has comprehensive data coverage.")
     
-    if not st.session_state.data_gaps_identified:
-        st.warning("⚠️ Please identify data gaps first in the Sub-question Analysis tab")
-    else:
-        st.success("✅ Data gaps identified! Review the gaps below.")
-        
-        # Display stored data gaps results
-        if st.session_state.data_gaps_results:
-            st.subheader("📊 Data Gaps Overview")
-            
-            if isinstance(st.session_state.data_gaps_results, list) and st.session_state.data_gaps_results:
-                st.error(f"⚠️ **Total Data Gaps Found:** {len(st.session_state.data_gaps_results)}")
-                
-                for i, gap in enumerate(st.session_state.data_gaps_results, 1):
-                    with st.expander(f"⚠️ Data Gap {i}: {gap.get('missing_variable', 'Unknown')}", expanded=True):
-                        col1, col2 = st.columns(2)
-                        
-                        with col1:
-                            st.markdown("**📝 Gap Description:**")
-                            st.write(gap.get('gap_description', 'No description'))
-                        
-                        with col2:
-                            st.markdown("**💡 Suggested Sources:**")
-                            st.write(gap.get('suggested_sources', 'No suggestions'))
-                        
-                        # Add gap metadata if available
-                        if gap.get('sub_question_id'):
-                            st.caption(f"Related to sub-question: {gap.get('sub_question_id')}")
-                        
-                        # Severity indicator
-                        if 'critical' in gap.get('gap_description', '').lower():
-                            st.error("🚨 Critical Gap")
-                        elif 'important' in gap.get('gap_description', '').lower():
-                            st.warning("⚠️ Important Gap")
-                        else:
-                            st.info("ℹ️ Minor Gap")
-            else:
-                st.success("✅ **No significant data gaps identified!**")
-                st.info("Your research project has comprehensive data coverage.")
-        
-        st.divider()
+    st.divider()
+    
+    if step_button("📚 Search Academic Literature", "literature", type="primary"):
+        literature = {}
+        status = {}
+        with in_flight("literature"), st.spinner("Searching academic literature with hierarchical ranking... This may take a moment."):
+            # Show progress as each sub-question's results arrive
+            st.write_stream(stream_literature_search(st.session_state.session_id, literature, status))
         
-        if st.button("📚 Search Academic Literature", type="primary"):
-            with st.spinner("Searching academic literature with hierarchical ranking... This may take a moment."):
-                search_data = {"session_id": st.session_state.session_id}
-                result = make_api_request("search-literature-analyzed", data=search_data)
-                
-                if result:
-                    st.session_state.literature_searched = True
-                    st.session_state.literature_results = result  # Store the results
-                    st.success("✅ Literature search completed with hierarchical confidence ranking!")
-                    st.info("**Next Step:** Go to Literature Search tab to view results")
-                    st.rerun()
+        if status.get("done"):
+            st.session_state.literature_searched = True
+            st.session_state.literature_results = {  # Store the results
+                "session_id": st.session_state.session_id,
+                "literature": literature,
+                "message": status.get("message", "")
+            }
+            st.session_state.literature_sorted = sort_literature(literature)
+            st.success("✅ Literature search completed with hierarchical confidence ranking!")
+            st.info("**Next Step:** Go to Literature Search tab to view results")
+        else:
+            st.error(status.get("error", "Literature search ended unexpectedly"))
 
-# Tab 5: Literature Search
-with tab5:
+def render_tab5():
+    """Step 5: ranked literature results and exports"""
     st.header("📚 Academic Literature Search")
     st.markdown("**Step 5:** Review hierarchically ranked literature results")
     
     if not st.session_state.literature_searched:
         st.warning("⚠️ Please complete literature search first in the Data Gaps tab")
-    else:
-        st.success("✅ Literature search completed with hierarchical ranking!")
+        return
+    
+    st.success("✅ Literature search completed with hierarchical ranking!")
+    
+    # Display stored literature results
+    if st.session_state.literature_results:
+        st.subheader("📊 Literature Search Results")
         
-        # Display stored literature results
-        if st.session_state.literature_results:
-            st.subheader("📊 Literature Search Results")
+        # Check if results contain literature data
+        if isinstance(st.session_state.literature_results, dict):
+            literature_data = st.session_state.literature_sorted or {}
             
-            # Check if results contain literature data
-            if isinstance(st.session_state.literature_results, dict):
-                literature_data = st.session_state.literature_results.get('literature', {})
+            if literature_data:
+                st.info(f"📈 **Literature found for {len(literature_data)} sub-questions**")
                 
-                if literature_data:
-                    st.info(f"📈 **Literature found for {len(literature_data)} sub-questions**")
-                    
-                    for sub_q_id, papers in literature_data.items():
-                        if papers:
-                            st.markdown(f"### 📖 Literature for Sub-question: {sub_q_id}")
-                            
-                            # Sort papers by relevance to create hierarchy
-                            sorted_papers = sorted(papers, key=lambda x: x.get('relevance', 0), reverse=True)
+                for sub_q_id, papers in literature_data.items():
+                    if papers:
+                        st.markdown(f"### 📖 Literature for Sub-question: {sub_q_id}")
+                        
+                        # Papers were sorted by relevance at ingestion to create hierarchy
+                        sorted_papers = papers
+                        
+                        # Display primary paper (highest relevance)
+                        if sorted_papers:
+                            primary_paper = sorted_papers[0]
                             
-                            # Display primary paper (highest relevance)
-                            if sorted_papers:
-                                primary_paper = sorted_papers[0]
+                            st.markdown("#### 🥇 Primary Reference (Highest Confidence)")
+                            with st.container():
+                                col1, col2 = st.columns([3, 1])
                                 
-                                st.markdown("#### 🥇 Primary Reference (Highest Confidence)")
-                                with st.container():
-                                    col1, col2 = st.columns([3, 1])
+                                with col1:
+                                    st.markdown(f"**{primary_paper.get('title', 'Unknown Title')}**")
+                                    
+                                    authors_text = primary_paper.get('authors_text', '')
+                                    if authors_text:
+                                        st.write(f"*Authors: {authors_text}*")
                                     
-                                    with col1:
-                                        st.markdown(f"**{primary_paper.get('title', 'Unknown Title')}**")
-                                        
-                                        authors = primary_paper.get('authors', [])
-                                        if authors:
-                                            st.write(f"*Authors: {', '.join(authors)}*")
-                                        
-                                        year = primary_paper.get('year', 'Unknown')
-                                        venue = primary_paper.get('venue', 'Unknown')
-                                        st.write(f"*Year: {year} | Venue: {venue}*")
-                                        
-                                        abstract = primary_paper.get('abstract', '')
-                                        if abstract:
-                                            with st.expander("📄 Abstract"):
-                                                st.write(abstract)
+                                    year = primary_paper.get('year', 'Unknown')
+                                    venue = primary_paper.get('venue', 'Unknown')
+                                    st.write(f"*Year: {year} | Venue: {venue}*")
                                     
-                                    with col2:
-                                        relevance = primary_paper.get('relevance', 0)
-                                        st.metric("Relevance Score", f"{relevance:.3f}")
-                                        
-                                        confidence_tier = primary_paper.get('confidence_tier', 'Unknown')
-                                        st.metric("Confidence", confidence_tier.title())
-                                        
-                                        url = primary_paper.get('url', '')
-                                        if url:
-                                            st.link_button("🔗 Read Paper", url)
+                                    abstract = primary_paper.get('abstract', '')
+                                    if abstract:
+                                        with st.expander("📄 Abstract"):
+                                            st.write(abstract)
                                 
-                                # Display secondary papers
-                                if len(sorted_papers) > 1:
-                                    st.markdown("#### 🥈 Secondary References")
+                                with col2:
+                                    relevance = primary_paper.get('relevance', 0)
+                                    st.metric("Relevance Score", f"{relevance:.3f}")
                                     
-                                    for i, paper in enumerate(sorted_papers[1:], 1):
-                                        with st.expander(f"Reference #{i}: {paper.get('title', 'Unknown')[:60]}..."):
-                                            col1, col2 = st.columns([3, 1])
-                                            
-                                            with col1:
-                                                authors = paper.get('authors', [])
-                                                if authors:
-                                                    st.write(f"**Authors:** {', '.join(authors)}")
-                                                
-                                                year = paper.get('year', 'Unknown')
-                                                venue = paper.get('venue', 'Unknown')
-                                                st.write(f"**Year:** {year} | **Venue:** {venue}")
-                                                
-                                                abstract = paper.get('abstract', '')
-                                                if abstract:
-                                                    st.write(f"**Abstract:** {abstract[:200]}...")
-                                            
-                                            with col2:
-                                                relevance = paper.get('relevance', 0)
-                                                st.metric("Score", f"{relevance:.3f}")
-                                                
-                                                confidence_tier = paper.get('confidence_tier', 'Unknown')
-                                                st.write(f"**Tier:** {confidence_tier.title()}")
-                                                
-                                                url = paper.get('url', '')
-                                                if url:
-                                                    st.link_button("🔗 View", url)
+                                    confidence_tier = primary_paper.get('confidence_tier', 'Unknown')
+                                    st.metric("Confidence", confidence_tier.title())
+                                    
+                                    url = primary_paper.get('url', '')
+                                    if url:
+                                        st.link_button("🔗 Read Paper", url)
                             
-                            st.divider()
-                else:
-                    st.info("No literature results found in the session data.")
+                            # Display secondary papers
+                            if len(sorted_papers) > 1:
+                                st.markdown("#### 🥈 Secondary References")
+                                
+                                # One HTML block for all supporting papers instead of ~8 widgets per paper
+                                st.markdown(
+                                    "".join(secondary_paper_card(i, paper) for i, paper in enumerate(sorted_papers[1:], 1)),
+                                    unsafe_allow_html=True
+                                )
+                        
+                        st.divider()
             else:
-                st.info("Literature results are not in the expected format.")
-        
-        # Literature Hierarchy Information
-        st.markdown("### � Literature Hierarchy System")
-        st.info("Papers are ranked by confidence using our enhanced scoring algorithm:")
+                st.info("No literature results found in the session data.")
+        else:
+            st.info("Literature results are not in the expected format.")
+    
+    # Literature Hierarchy Information
+    st.markdown("### � Literature Hierarchy System")
+    st.info("Papers are ranked by confidence using our enhanced scoring algorithm:")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("**🥇 Primary References**")
+        st.markdown("- Highest confidence scores (≥0.8)")
+        st.markdown("- Most relevant to research questions")
+        st.markdown("- Best semantic similarity match")
         
-        col1, col2 = st.columns(2)
-        with col1:
-            st.markdown("**🥇 Primary References**")
-            st.markdown("- Highest confidence scores (≥0.8)")
-            st.markdown("- Most relevant to research questions")
-            st.markdown("- Best semantic similarity match")
+    with col2:
+        st.markdown("**🥈 Secondary References**")
+        st.markdown("- Supporting evidence papers")
+        st.markdown("- Ranked by descending relevance")
+        st.markdown("- Citation impact weighted")
+    
+    # Export options
+    st.markdown("### 💾 Export Options")
+    col1, col2, col3 = st.columns(3)
+    
+    # One timestamp shared by every export payload and filename
+    now = datetime.now()
+    now_iso = now.isoformat()
+    file_stamp = now.strftime('%Y%m%d_%H%M%S')
+    
+    with col1:
+        if st.button("📄 Export JSON Results"):
+            export_data = {
+                "session_id": st.session_state.session_id,
+                "workflow_completed": True,
+                "timestamp": now_iso,
+                "analysis_results": st.session_state.analysis_results,
+                "data_gaps": st.session_state.data_gaps_results,
+                "literature": st.session_state.literature_results
+            }
+            # Payload is only built after the export click; compact bytes go straight to the button
+            st.download_button(
+                label="⬇️ Download JSON",
+                data=orjson.dumps(export_data, option=orjson.OPT_SERIALIZE_NUMPY),
+                file_name=f"research_{file_stamp}.json",
+                mime="application/json"
+            )
+    
+    with col2:
+        if st.button("📊 Export CSV Summary"):
+            # Create comprehensive summary
+            summary_data = {
+                "Session_ID": [st.session_state.session_id],
+                "Timestamp": [now_iso],
+                "Status": ["Completed"],
+                "Sub_Questions_Analyzed": [len(st.session_state.analysis_results) if st.session_state.analysis_results else 0],
+                "Data_Gaps_Found": [len(st.session_state.data_gaps_results) if st.session_state.data_gaps_results else 0],
+                "Literature_Sources": [len(st.session_state.literature_results.get('literature', {})) if st.session_state.literature_results else 0]
+            }
+            # Single summary row: write it directly instead of building a DataFrame
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(summary_data.keys())
+            writer.writerow([values[0] for values in summary_data.values()])
+            st.download_button(
+                label="⬇️ Download CSV",
+                data=buffer.getvalue(),
+                file_name=f"summary_{file_stamp}.csv",
+                mime="text/csv"
+            )
+    
+    with col3:
+        if st.button("📋 Generate Report"):
+            st.markdown("#### 📋 Complete Workflow Summary")
+            st.markdown(f"**Session:** `{st.session_state.session_id}`")
+            st.markdown(f"**Completed:** {now.strftime('%Y-%m-%d %H:%M:%S')}")
+            st.markdown("**Status:** ✅ All 5 systematic steps completed")
             
-        with col2:
-            st.markdown("**🥈 Secondary References**")
-            st.markdown("- Supporting evidence papers")
-            st.markdown("- Ranked by descending relevance")
-            st.markdown("- Citation impact weighted")
-        
-        # Export options
-        st.markdown("### 💾 Export Options")
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            if st.button("📄 Export JSON Results"):
-                export_data = {
-                    "session_id": st.session_state.session_id,
-                    "workflow_completed": True,
-                    "timestamp": datetime.now().isoformat(),
-                    "analysis_results": st.session_state.analysis_results,
-                    "data_gaps": st.session_state.data_gaps_results,
-                    "literature": st.session_state.literature_results
-                }
-                st.download_button(
-                    label="⬇️ Download JSON",
-                    data=json.dumps(export_data, indent=2, default=str),
-                    file_name=f"research_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
-                    mime="application/json"
-                )
-        
-        with col2:
-            if st.button("📊 Export CSV Summary"):
-                # Create comprehensive summary
-                summary_data = {
-                    "Session_ID": [st.session_state.session_id],
-                    "Timestamp": [datetime.now().isoformat()],
-                    "Status": ["Completed"],
-                    "Sub_Questions_Analyzed": [len(st.session_state.analysis_results) if st.session_state.analysis_results else 0],
-                    "Data_Gaps_Found": [len(st.session_state.data_gaps_results) if st.session_state.data_gaps_results else 0],
-                    "Literature_Sources": [len(st.session_state.literature_results.get('literature', {})) if st.session_state.literature_results else 0]
-                }
-                df = pd.DataFrame(summary_data)
-                csv = df.to_csv(index=False)
-                st.download_button(
-                    label="⬇️ Download CSV",
-                    data=csv,
-                    file_name=f"summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                    mime="text/csv"
-                )
-        
-        with col3:
-            if st.button("📋 Generate Report"):
-                st.markdown("#### 📋 Complete Workflow Summary")
-                st.markdown(f"**Session:** `{st.session_state.session_id}`")
-                st.markdown(f"**Completed:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-                st.markdown("**Status:** ✅ All 5 systematic steps completed")
-                
-                # Summary statistics
-                if st.session_state.analysis_results:
-                    st.markdown(f"- **Sub-questions Analyzed:** {len(st.session_state.analysis_results)}")
-                if st.session_state.data_gaps_results:
-                    st.markdown(f"- **Data Gaps Identified:** {len(st.session_state.data_gaps_results)}")
-                if st.session_state.literature_results:
-                    lit_count = len(st.session_state.literature_results.get('literature', {}))
-                    st.markdown(f"- **Literature Sources Found:** {lit_count}")
-                
-                st.markdown("**Workflow Quality:** ✅ Real academic sources with hierarchical ranking")
+            # Summary statistics
+            if st.session_state.analysis_results:
+                st.markdown(f"- **Sub-questions Analyzed:** {len(st.session_state.analysis_results)}")
+            if st.session_state.data_gaps_results:
+                st.markdown(f"- **Data Gaps Identified:** {len(st.session_state.data_gaps_results)}")
+            if st.session_state.literature_results:
+                lit_count = len(st.session_state.literature_results.get('literature', {}))
+                st.markdown(f"- **Literature Sources Found:** {lit_count}")
+            
+            st.markdown("**Workflow Quality:** ✅ Real academic sources with hierarchical ranking")
+
+# Main App Layout
+st.title("🔬 AI Research Agent")
+st.markdown("*Systematic research workflow with complete API integration*")
+
+# Main Content Tabs
+tab1, tab2, tab3, tab4, tab5 = st.tabs(["🎯 Project Setup", "❓ Research Questions", "📋 Sub-question Analysis", "⚠️ Data Gaps", "📚 Literature Search"])
+
+# Tab 1: Project Setup
+with tab1:
+    render_tab1()
+
+# Tab 2: Research Questions
+with tab2:
+    render_tab2()
+
+# Tab 3: Sub-question Analysis
+with tab3:
+    render_tab3()
+
+# Tab 4: Data Gaps
+with tab4:
+    render_tab4()
+
+# Tab 5: Literature Search
+with tab5:
+    render_tab5()
+
+# Sidebar - Workflow Status
+with st.sidebar:
+    render_sidebar()
 
 # Footer
 st.markdown("---")
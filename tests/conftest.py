@@ -0,0 +1,36 @@
+"""
+Shared fixtures and helpers for the API test scripts (they expect a server at each module's BASE_URL)
+"""
+
+import socket
+from urllib.parse import urlsplit
+
+import httpx
+import pytest
+
+def prewarm(client, base_url: str) -> None:
+    """
+    Resolve the API host and open a keep-alive connection on client (a requests.Session or
+    httpx.Client) before the first real test; errors are ignored
+    """
+    url = urlsplit(base_url)
+    try:
+        socket.getaddrinfo(url.hostname, url.port)
+        client.get(f"{base_url}/health", timeout=5)
+    except (OSError, httpx.HTTPError):  # requests' exceptions are OSErrors
+        pass
+
+async def prime_async(client: httpx.AsyncClient) -> None:
+    """Open a connection in the async pool so the first check doesn't pay the connect"""
+    try:
+        await client.get("/health", timeout=5)
+    except httpx.HTTPError:
+        pass
+
+@pytest.fixture(scope="module", autouse=True)
+def _prewarm(request):
+    # Warms the module's own shared client (CLIENT or SESSION) once before its first test,
+    # rather than at import, so collection stays side-effect free
+    client = getattr(request.module, "CLIENT", None) or getattr(request.module, "SESSION", None)
+    if client is not None:
+        prewarm(client, request.module.BASE_URL)
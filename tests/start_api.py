@@ -23,11 +23,15 @@ if __name__ == "__main__":
     print("Press Ctrl+C to stop the server")
     print()
     
-    # Run the server
+    # Run the server ("auto" prefers uvloop/httptools when installed, e.g. not on Windows)
     uvicorn.run(
-        "app.api:app",
+        "app.app:create_app",
+        factory=True,
         host="0.0.0.0",
         port=8000,
         reload=True,  # Enable auto-reload during development
-        log_level="info"
+        log_level="info",
+        loop="auto",
+        http="auto",
+        workers=1
     )
@@ -0,0 +1,35 @@
+"""
+Production-style startup script for load testing the AI Research Agent FastAPI server.
+Runs the app under gunicorn with several uvicorn workers (Linux/macOS only).
+"""
+
+import os
+import subprocess
+import sys
+
+if __name__ == "__main__":
+    # Load environment variables
+    from dotenv import load_dotenv
+    load_dotenv()
+    
+    # 2 * cores + 1 workers unless WORKERS overrides it
+    workers = int(os.getenv("WORKERS", str(2 * (os.cpu_count() or 1) + 1)))
+    
+    if not os.getenv("REDIS_URL"):
+        print("WARNING: REDIS_URL is not set; chat sessions are per-worker and will not be shared!")
+        print()
+    
+    print(f"Starting AI Research Agent FastAPI server with {workers} workers...")
+    print("API Base URL: http://localhost:8000")
+    print("Press Ctrl+C to stop the server")
+    print()
+    
+    # --preload imports the app once before forking so workers share it copy-on-write
+    sys.exit(subprocess.run([
+        "gunicorn",
+        "app.app:create_app()",
+        "-k", "uvicorn.workers.UvicornWorker",
+        "-w", str(workers),
+        "-b", "0.0.0.0:8000",
+        "--preload"
+    ]).returncode)
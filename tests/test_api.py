@@ -1,27 +1,45 @@
 """
 Test client for the AI Research Agent FastAPI endpoints
-Run this script to test all the API endpoints
+Run this script to test all the API endpoints, or run them in parallel with pytest-xdist:
+    pytest -n 4 --dist loadgroup tests/test_api.py
 """
 
+import asyncio
+import httpx
+import ijson
+import pytest
 import requests
+from requests.adapters import HTTPAdapter
 import json
 from typing import Dict, Any
 from datetime import datetime
 
+from conftest import prewarm, prime_async
+
 # Base URL for the API
 BASE_URL = "http://localhost:8000"
 
-def test_welcome():
+# One keep-alive session shared by every call so tests reuse the same connection
+SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=0)
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+
+async def check_welcome(client: httpx.AsyncClient):
     """Test the welcome endpoint"""
+    response = await client.get("/")
+    # Header is printed after the await so concurrent tests don't interleave their output
     print("=== Testing Welcome Endpoint ===")
-    response = requests.get(f"{BASE_URL}/")
     print(f"Status: {response.status_code}")
     print(f"Response: {response.json()}")
     print()
+    
+    assert response.status_code == 200
+    assert "message" in response.json()
 
-def test_create_session():
-    """Test creating a new session"""
-    print("=== Testing Session Creation ===")
+def create_session():
+    """Generate questions for a new project (returns the response body, or None on failure)"""
+    print("=== Testing Question Generation (creates the session) ===")
     
     project_data = {
         "title": "Maternal Mortality Trends in Rural Kenya",
@@ -34,193 +52,166 @@ def test_create_session():
         ]
     }
     
-    response = requests.post(f"{BASE_URL}/session", json=project_data)
+    response = SESSION.post(f"{BASE_URL}/api/generate-questions", json=project_data)
     print(f"Status: {response.status_code}")
     
     if response.status_code == 200:
         result = response.json()
         print(f"Session ID: {result['session_id']}")
         print(f"Expires at: {result['expires_at']}")
-        # Return the session ID for use in other tests
-        return result['session_id']
+        # Return the generated questions for use in other tests
+        return result
     else:
         print(f"Error: {response.text}")
         return None
-    print()
 
-def test_generate_main_question(session_id):
-    """Test generating the main research question"""
+@pytest.fixture(scope="module")
+def workflow():
+    """One generated session shared by the stateful workflow tests"""
+    result = create_session()
+    assert result is not None, "POST /api/generate-questions failed"
+    return result
+
+@pytest.mark.xdist_group("workflow")
+def test_generate_questions(workflow):
+    """Test the generated main questions and their sub-questions"""
     print("=== Testing Main Question Generation ===")
     
-    session_data = {
-        "session_id": session_id
-    }
-    
-    response = requests.post(f"{BASE_URL}/research/main-question", json=session_data)
-    print(f"Status: {response.status_code}")
-    
-    if response.status_code == 200:
-        result = response.json()
-        print("Main Question:")
-        print(f"  ID: {result['id']}")
-        print(f"  Question: {result['text']}")
-        print(f"  Type: {result['question_type']}")
-    else:
-        print(f"Error: {response.text}")
+    assert workflow["session_id"]
+    assert workflow["main_questions"], "No main questions generated"
+    for i, mq in enumerate(workflow["main_questions"], 1):
+        assert {"id", "text", "question_type", "sub_questions"} <= mq.keys()
+        print(f"  {i}. {mq['text']} ({len(mq['sub_questions'])} sub-questions)")
+        for sq in mq["sub_questions"]:
+            assert sq["parent_question_id"] == mq["id"]
     print()
 
-def test_generate_sub_questions(session_id):
-    """Test generating sub-questions"""
-    print("=== Testing Sub-Question Generation ===")
-    
-    session_data = {
-        "session_id": session_id
-    }
+@pytest.mark.xdist_group("workflow")
+def test_get_session(workflow):
+    """Test reading back the session state"""
+    print("=== Testing Session State ===")
     
-    response = requests.post(f"{BASE_URL}/research/sub-questions", json=session_data)
+    response = SESSION.get(f"{BASE_URL}/api/session/{workflow['session_id']}")
     print(f"Status: {response.status_code}")
+    assert response.status_code == 200, response.text
     
-    if response.status_code == 200:
-        sub_questions = response.json()
-        print(f"Generated {len(sub_questions)} sub-questions:")
-        for i, sq in enumerate(sub_questions, 1):
-            print(f"  {i}. {sq['text']}")
-    else:
-        print(f"Error: {response.text}")
+    state = response.json()
+    print(f"Main questions: {state['main_questions_count']}, sub-questions: {state['sub_questions_count']}")
+    assert state["session_id"] == workflow["session_id"]
+    assert state["main_questions_count"] == len(workflow["main_questions"])
+    assert state["workflow_status"]["questions_generated"] is True
     print()
 
-def test_generate_mappings(session_id):
-    """Test generating mappings for sub-questions"""
+@pytest.mark.xdist_group("workflow")
+def test_analyze_subquestions(workflow):
+    """Test generating data requirements and analysis approaches for sub-questions"""
     print("=== Testing Sub-Question Mappings ===")
     
-    session_data = {
-        "session_id": session_id
+    request_data = {
+        "session_id": workflow["session_id"],
+        "main_question_ids": [mq["id"] for mq in workflow["main_questions"]]
     }
     
-    response = requests.post(f"{BASE_URL}/research/mappings", json=session_data)
+    response = SESSION.post(f"{BASE_URL}/api/analyze-subquestions", json=request_data)
     print(f"Status: {response.status_code}")
+    assert response.status_code == 200, response.text
     
-    if response.status_code == 200:
-        mappings = response.json()
-        for i, mapping in enumerate(mappings, 1):
-            print(f"\n{i}. {mapping['sub_question']}")
-            print(f"   Data Requirements: {mapping['data_requirements'][:100]}...")
-            print(f"   Analysis Approach: {mapping['analysis_approach'][:100]}...")
-    else:
-        print(f"Error: {response.text}")
+    mappings = response.json()
+    assert isinstance(mappings, list) and mappings, "No mappings returned"
+    for i, mapping in enumerate(mappings, 1):
+        assert {"sub_question_id", "sub_question", "data_requirements", "analysis_approach"} <= mapping.keys()
+        print(f"\n{i}. {mapping['sub_question']}")
+        print(f"   Data Requirements: {mapping['data_requirements'][:100]}...")
+        print(f"   Analysis Approach: {mapping['analysis_approach'][:100]}...")
     print()
 
-def test_identify_data_gaps(session_id):
+@pytest.mark.xdist_group("workflow")
+def test_identify_data_gaps(workflow):
     """Test identifying data gaps"""
     print("=== Testing Data Gaps Identification ===")
     
-    session_data = {
-        "session_id": session_id
-    }
-    
-    response = requests.post(f"{BASE_URL}/research/data-gaps", json=session_data)
+    response = SESSION.post(f"{BASE_URL}/api/identify-data-gaps", json={"session_id": workflow["session_id"]})
     print(f"Status: {response.status_code}")
+    assert response.status_code == 200, response.text
     
-    if response.status_code == 200:
-        gaps = response.json()
-        for i, gap in enumerate(gaps, 1):
-            print(f"\n{i}. Missing Variable: {gap['missing_variable']}")
-            print(f"   Description: {gap['gap_description'][:100]}...")
-            print(f"   Sources: {gap['suggested_sources'][:100]}...")
-    else:
-        print(f"Error: {response.text}")
+    gaps = response.json()
+    assert isinstance(gaps, list)
+    for i, gap in enumerate(gaps, 1):
+        assert {"id", "missing_variable", "gap_description", "suggested_sources", "sub_question_id"} <= gap.keys()
+        print(f"\n{i}. Missing Variable: {gap['missing_variable']}")
+        print(f"   Description: {gap['gap_description'][:100]}...")
+        print(f"   Sources: {gap['suggested_sources'][:100]}...")
     print()
 
-def test_literature_search(session_id):
-    """Test literature search for all sub-questions"""
+def _check_literature(literature: Dict[str, Any]):
+    """Shape checks shared by the literature responses (papers keyed by sub-question ID)"""
+    assert isinstance(literature, dict)
+    for sq_id, papers in literature.items():
+        print(f"\nSub-question ID: {sq_id}")
+        print(f"Found {len(papers)} papers:")
+        for paper in papers:
+            assert {"id", "title", "authors", "relevance", "source", "sub_question_id"} <= paper.keys()
+        for i, paper in enumerate(papers[:2], 1):  # Show only first 2 papers per question
+            print(f"  {i}. {paper['title']}")
+            print(f"     Relevance: {paper['relevance']:.3f}")
+
+@pytest.mark.xdist_group("workflow")
+def test_literature_search(workflow):
+    """Test literature search for all analyzed sub-questions"""
     print("=== Testing Literature Search for Sub-Questions ===")
     
-    session_data = {
-        "session_id": session_id
-    }
+    response = SESSION.post(f"{BASE_URL}/api/search-literature-analyzed", json={"session_id": workflow["session_id"]})
+    print(f"Status: {response.status_code}")
+    assert response.status_code == 200, response.text
     
-    response = requests.post(f"{BASE_URL}/research/literature", json=session_data)
+    result = response.json()
+    assert result["session_id"] == workflow["session_id"]
+    _check_literature(result["literature"])
+    print()
+
+@pytest.mark.xdist_group("workflow")
+def test_run_workflow(workflow):
+    """Test running data gaps and literature search together"""
+    print("=== Testing Combined Data Gaps + Literature Run ===")
+    
+    response = SESSION.post(f"{BASE_URL}/api/run-workflow", json={"session_id": workflow["session_id"]})
     print(f"Status: {response.status_code}")
+    assert response.status_code == 200, response.text
     
-    if response.status_code == 200:
-        literature = response.json()
-        for sq_id, papers in literature.items():
-            print(f"\nSub-question ID: {sq_id}")
-            print(f"Found {len(papers)} papers:")
-            for i, paper in enumerate(papers[:2], 1):  # Show only first 2 papers per question
-                print(f"  {i}. {paper['title']}")
-                print(f"     Relevance: {paper['relevance']:.3f}")
-    else:
-        print(f"Error: {response.text}")
+    result = response.json()
+    assert isinstance(result["data_gaps"], list)
+    print(f"Data Gaps: {len(result['data_gaps'])}")
+    _check_literature(result["literature"])
     print()
 
-def test_specific_literature_search():
+async def check_specific_literature_search(client: httpx.AsyncClient):
     """Test specific literature search"""
-    print("=== Testing Specific Literature Search ===")
-    
     search_data = {
         "query": "maternal mortality Kenya",
         "limit": 5
     }
     
-    response = requests.post(f"{BASE_URL}/literature/search", json=search_data)
+    response = await client.post("/api/literature/search", json=search_data)
+    print("=== Testing Specific Literature Search ===")
     print(f"Status: {response.status_code}")
+    assert response.status_code == 200, response.text
     
-    if response.status_code == 200:
-        papers = response.json()
-        print(f"Found {len(papers)} papers:")
-        for i, paper in enumerate(papers, 1):
-            print(f"\n{i}. {paper['title']}")
-            print(f"   Authors: {', '.join(paper['authors'][:3])}")
-            print(f"   Year: {paper.get('year', 'N/A')}")
-            print(f"   Relevance: {paper['relevance']:.3f}")
-            print(f"   Source: {paper['source']}")
-    else:
-        print(f"Error: {response.text}")
+    papers = response.json()
+    assert isinstance(papers, list) and len(papers) <= search_data["limit"]
+    print(f"Found {len(papers)} papers:")
+    for i, paper in enumerate(papers, 1):
+        assert {"title", "authors", "year", "relevance", "source"} <= paper.keys()
+        print(f"\n{i}. {paper['title']}")
+        print(f"   Authors: {', '.join(paper['authors'][:3])}")
+        print(f"   Year: {paper.get('year', 'N/A')}")
+        print(f"   Relevance: {paper['relevance']:.3f}")
+        print(f"   Source: {paper['source']}")
     print()
 
-def test_get_complete_research(session_id):
-    """Test getting complete research analysis"""
+def test_complete_analysis():
+    """Test running the complete workflow in one request"""
     print("=== Testing Complete Research Analysis ===")
     
-    session_data = {
-        "session_id": session_id
-    }
-    
-    response = requests.get(f"{BASE_URL}/research/complete", json=session_data)
-    print(f"Status: {response.status_code}")
-    
-    if response.status_code == 200:
-        result = response.json()
-        
-        print("MAIN QUESTION:")
-        print(f"  {result['main_question']['text']}")
-        
-        print(f"\nSUB-QUESTIONS ({len(result['sub_questions'])}):")
-        for i, sq in enumerate(result['sub_questions'], 1):
-            print(f"  {i}. {sq['text']}")
-        
-        print(f"\nDATA REQUIREMENTS & ANALYSIS ({len(result['mappings'])}):")
-        for i, mapping in enumerate(result['mappings'], 1):
-            print(f"  {i}. {mapping['sub_question'][:50]}...")
-        
-        print(f"\nDATA GAPS ({len(result['data_gaps'])}):")
-        for i, gap in enumerate(result['data_gaps'], 1):
-            print(f"  {i}. {gap['missing_variable']}")
-        
-        print(f"\nLITERATURE:")
-        total_papers = sum(len(papers) for papers in result['literature'].values())
-        print(f"  Found literature for {len(result['literature'])} sub-questions")
-        print(f"  Total papers: {total_papers}")
-        
-    else:
-        print(f"Error: {response.text}")
-    print()
-
-def test_run_all_workflow():
-    """Test running the complete workflow in one go"""
-    print("=== Testing Complete Workflow Run ===")
-    
     project_data = {
         "title": "Healthcare Access in Urban Slums",
         "description": "Analyze barriers to healthcare access in urban informal settlements",
@@ -228,67 +219,100 @@ def test_run_all_workflow():
         "geography": "Nairobi, Kenya"
     }
     
-    response = requests.post(f"{BASE_URL}/research/run-all", json=project_data)
-    print(f"Status: {response.status_code}")
-    
-    if response.status_code == 200:
-        result = response.json()
-        print(f"Session ID: {result['session_id']}")
-        print(f"Expires at: {result['expires_at']}")
-        
-        workflow_result = result.get('result', {})
-        print("\nWorkflow Result:")
-        
-        if 'main_question' in workflow_result:
-            print(f"Main Question: {workflow_result['main_question']['text']}")
-        
-        if 'sub_questions' in workflow_result:
-            print(f"Sub-questions: {len(workflow_result['sub_questions'])}")
+    # Stream-decode the (potentially large) body, printing each top-level section as it arrives
+    with SESSION.post(f"{BASE_URL}/api/complete-analysis", json=project_data, stream=True) as response:
+        print(f"Status: {response.status_code}")
+        assert response.status_code == 200, response.text
         
-        if 'mappings' in workflow_result:
-            print(f"Mappings: {len(workflow_result['mappings'])}")
+        response.raw.decode_content = True  # undo gzip transfer encoding before parsing
+        sections = set()
+        for key, value in ijson.kvitems(response.raw, ""):
+            sections.add(key)
+            if key == 'main_questions':
+                assert value, "No main questions generated"
+                print(f"MAIN QUESTIONS ({len(value)}):")
+                for i, mq in enumerate(value, 1):
+                    print(f"  {i}. {mq['text']}")
+            
+            elif key == 'sub_questions':
+                print(f"\nSUB-QUESTIONS ({len(value)}):")
+                for i, sq in enumerate(value, 1):
+                    print(f"  {i}. {sq['text']}")
+            
+            elif key == 'mappings':
+                print(f"\nDATA REQUIREMENTS & ANALYSIS ({len(value)}):")
+                for i, mapping in enumerate(value, 1):
+                    print(f"  {i}. {mapping['sub_question'][:50]}...")
+            
+            elif key == 'data_gaps':
+                print(f"\nDATA GAPS ({len(value)}):")
+                for i, gap in enumerate(value, 1):
+                    print(f"  {i}. {gap['missing_variable']}")
+            
+            elif key == 'literature':
+                print(f"\nLITERATURE:")
+                # One pass counts both sub-questions and papers
+                sub_question_count = total_papers = 0
+                for papers in value.values():
+                    sub_question_count += 1
+                    total_papers += len(papers)
+                print(f"  Found literature for {sub_question_count} sub-questions")
+                print(f"  Total papers: {total_papers}")
         
-        if 'data_gaps' in workflow_result:
-            print(f"Data Gaps: {len(workflow_result['data_gaps'])}")
-        
-        if 'literature' in workflow_result:
-            lit_count = sum(len(papers) for papers in workflow_result['literature'].values())
-            print(f"Literature: {lit_count} papers")
-    else:
-        print(f"Error: {response.text}")
+        assert sections == {"main_questions", "sub_questions", "mappings", "data_gaps", "literature"}
     print()
 
+async def _run_checks(*checks):
+    """Run checks that don't depend on each other concurrently over one async client"""
+    async with httpx.AsyncClient(
+        base_url=BASE_URL,
+        timeout=30,
+        limits=httpx.Limits(max_keepalive_connections=20)
+    ) as client:
+        await prime_async(client)
+        await asyncio.gather(*(check(client) for check in checks))
+
+def run_independent_tests():
+    """Run all session-independent checks together"""
+    asyncio.run(_run_checks(check_welcome, check_specific_literature_search))
+    test_complete_analysis()
+
+# Session-independent tests: xdist may spread these across workers
+def test_welcome():
+    asyncio.run(_run_checks(check_welcome))
+
+def test_specific_literature_search():
+    asyncio.run(_run_checks(check_specific_literature_search))
+
 def main():
     """Run all tests"""
     print("AI Research Agent API Test Client")
     print("=" * 50)
     
     try:
-        # Test each endpoint in sequence
-        test_welcome()
-        
         # Create a session and use it for subsequent tests
-        session_id = test_create_session()
+        workflow = create_session()
         
-        if session_id:
+        if workflow:
             # Step-by-step workflow
-            test_generate_main_question(session_id)
-            test_generate_sub_questions(session_id)
-            test_generate_mappings(session_id)
-            test_identify_data_gaps(session_id)
-            test_literature_search(session_id)
-            test_get_complete_research(session_id)
+            test_generate_questions(workflow)
+            test_get_session(workflow)
+            test_analyze_subquestions(workflow)
+            test_identify_data_gaps(workflow)
+            test_literature_search(workflow)
+            test_run_workflow(workflow)
         
         # Tests that don't require a session
-        test_specific_literature_search()
-        test_run_all_workflow()
+        run_independent_tests()
         
         print("All tests completed!")
         
-    except requests.exceptions.ConnectionError:
+    except (requests.exceptions.ConnectionError, httpx.ConnectError):
         print("Error: Could not connect to the API server.")
         print("Make sure the FastAPI server is running on http://localhost:8000")
         print("Run: python start_api.py")
 
 if __name__ == "__main__":
-    main()
+    with SESSION:
+        prewarm(SESSION, BASE_URL)
+        main()
@@ -0,0 +1,115 @@
+"""
+Tests for the two-tier TTL cache in utils/cache_utils.py
+Run with: pytest tests/test_cache_utils.py
+"""
+
+import os
+import sqlite3
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from config.config import get_settings
+from utils import cache_utils
+from utils.cache_utils import TTLCache, ttl_cached
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """Point the sqlite caches at a per-test directory"""
+    monkeypatch.setenv("RESEARCH_CACHE_DIR", str(tmp_path))
+    get_settings.cache_clear()
+    yield tmp_path
+    get_settings.cache_clear()
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.time() for the cache module"""
+    now = [1000.0]
+    monkeypatch.setattr(cache_utils.time, "time", lambda: now[0])
+    return now
+
+def _disk_keys(cache_dir, name):
+    with sqlite3.connect(os.path.join(cache_dir, f"{name}.sqlite3")) as db:
+        return [key for (key,) in db.execute("SELECT key FROM entries ORDER BY key")]
+
+def test_hit_returns_fresh_copy_and_survives_reopen():
+    cache = TTLCache("values", ttl=60)
+    cache.set("k", [{"title": "A", "relevance": 0.5}])
+    
+    cache.get("k")[0]["title"] = "mutated"
+    assert cache.get("k") == [{"title": "A", "relevance": 0.5}]
+    assert TTLCache("values", ttl=60).get("k") == [{"title": "A", "relevance": 0.5}]
+
+def test_expired_entries_are_misses_and_deleted(cache_dir, clock):
+    cache = TTLCache("expiry", ttl=10)
+    cache.set("k", 1)
+    
+    clock[0] += 5
+    assert cache.get("k") == 1
+    
+    clock[0] += 10
+    assert cache.get("k") is None
+    assert _disk_keys(cache_dir, "expiry") == []
+
+def test_expired_rows_are_swept_on_open(cache_dir, clock):
+    cache = TTLCache("sweep", ttl=10)
+    cache.set("old", 1)
+    clock[0] += 20
+    cache.set("new", 2)
+    
+    TTLCache("sweep", ttl=10)
+    assert _disk_keys(cache_dir, "sweep") == ["new"]
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = TTLCache("lru", ttl=60, maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    
+    assert list(cache._memory) == ["a", "c"]
+    # Evicted from memory only; the disk tier still serves it
+    assert cache.get("b") == 2
+
+def test_undecodable_row_is_a_miss(cache_dir):
+    cache = TTLCache("corrupt", ttl=60)
+    cache.set("k", 1)
+    with sqlite3.connect(os.path.join(cache_dir, "corrupt.sqlite3")) as db:
+        db.execute("UPDATE entries SET payload = ? WHERE key = 'k'", (b"\x80not json",))
+    
+    reopened = TTLCache("corrupt", ttl=60)
+    assert reopened.get("k") is None
+    assert _disk_keys(cache_dir, "corrupt") == []
+
+def test_custom_codec_round_trip():
+    cache = TTLCache("codec", ttl=60, encode=str.encode, decode=bytes.decode)
+    cache.set_many({"a": "x", "b": "y"})
+    assert (cache.get("a"), TTLCache("codec", ttl=60, encode=str.encode, decode=bytes.decode).get("b")) == ("x", "y")
+
+def test_ttl_cached_does_not_store_empty_results():
+    calls = []
+    
+    @ttl_cached("empty", ttl=60)
+    def search(query):
+        calls.append(query)
+        return []
+    
+    search("q")
+    search("q")
+    assert calls == ["q", "q"]
+
+def test_ttl_cached_positional_and_keyword_arguments_share_a_key():
+    calls = []
+    
+    @ttl_cached("binding", ttl=60)
+    def search(query, limit=5):
+        calls.append((query, limit))
+        return [{"query": query, "limit": limit}]
+    
+    assert search("q", 5) == search("q", limit=5) == search("q") == [{"query": "q", "limit": 5}]
+    assert calls == [("q", 5)]
+    
+    search("q", 3)
+    assert calls == [("q", 5), ("q", 3)]
@@ -0,0 +1,43 @@
+"""
+Tests for the chatbot WebSocket frames in app/chatbot_api.py
+Run with: pytest tests/test_chatbot_websocket.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import chatbot_api
+from model.models import ResearchQuestion
+
+def test_status_frame_after_question_generation_carries_dicts(monkeypatch):
+    agent = chatbot_api.conversational_agent
+    questions = [
+        ResearchQuestion(text="Which regions are most affected?", question_type="sub"),
+        ResearchQuestion(text="How has it changed over time?", question_type="sub"),
+    ]
+    # Stand in for the LLM workflow; the agent stores whatever it returns in the session
+    monkeypatch.setattr(agent.research_assistant, "run_complete_workflow", lambda *args, **kwargs: {"sub_questions": questions})
+    
+    session_id = agent.start_chat_session("ws-test")["session_id"]
+    agent.sessions[session_id]["current_project"] = {"description": "Maternal health in rural Kenya"}
+    agent.sessions.save(session_id)
+    
+    app = FastAPI()
+    app.include_router(chatbot_api.chatbot_router)
+    expected = [question.model_dump() for question in questions]
+    
+    with TestClient(app).websocket_connect(f"/api/chatbot/ws/{session_id}") as websocket:
+        websocket.send_json({"type": "message", "text": "Generate questions", "action": "generate_questions"})
+        reply = websocket.receive_json()
+        assert reply["status"] == "questions_generated"
+        assert reply["research_questions"] == expected
+        
+        websocket.send_json({"type": "status"})
+        status = websocket.receive_json()
+        assert status["session_id"] == session_id
+        assert status["research_context"]["generated_questions"] == expected
@@ -0,0 +1,134 @@
+"""
+Tests for the LLM response parsers in utils/parser_utils.py
+Run with: pytest tests/test_parser_utils.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from utils.parser_utils import parse_main_and_sub_questions, parse_subquestion_mappings
+
+QUESTIONS_TEXT = (
+    "MAIN QUESTION 1:\n"
+    "What drives maternal mortality?\n"
+    "\n"
+    "SUB-QUESTIONS:\n"
+    "- Which regions are most affected?\n"
+    "- How has it changed over time?\n"
+    "\n"
+    "MAIN QUESTION 2:\n"
+    "How accessible are health facilities?\n"
+    "SUB-QUESTIONS:\n"
+    "- What is the average travel distance?\n"
+)
+
+def test_questions_standard_format():
+    result = parse_main_and_sub_questions(QUESTIONS_TEXT)
+    assert result["main_questions"] == [
+        "What drives maternal mortality?",
+        "How accessible are health facilities?",
+    ]
+    assert result["sub_questions_by_main"] == {
+        0: ["Which regions are most affected?", "How has it changed over time?"],
+        1: ["What is the average travel distance?"],
+    }
+
+def test_questions_flattened_sub_questions_reference_their_main_question():
+    for text in (QUESTIONS_TEXT, QUESTIONS_TEXT.replace("\n", "\r\n")):
+        result = parse_main_and_sub_questions(text)
+        assert result["sub_questions"] == [
+            {
+                "text": sub_q,
+                "main_question_index": main_idx,
+                "main_question_text": result["main_questions"][main_idx],
+            }
+            for main_idx, sub_list in result["sub_questions_by_main"].items()
+            for sub_q in sub_list
+        ]
+        assert len(result["sub_questions"]) == 3
+
+def test_questions_crlf_line_endings():
+    result = parse_main_and_sub_questions(QUESTIONS_TEXT.replace("\n", "\r\n"))
+    assert result == parse_main_and_sub_questions(QUESTIONS_TEXT)
+
+def test_questions_item_after_interleaved_text_line():
+    text = "MAIN QUESTION 1:\nWhat is A?\nSUB-QUESTIONS:\n- a\n- b\nSome interleaved note\n- c\n"
+    result = parse_main_and_sub_questions(text)
+    assert result["sub_questions_by_main"] == {0: ["a", "b", "c"]}
+
+def test_questions_inline_main_question_keeps_sub_questions():
+    text = "MAIN QUESTION 1: What is A?\nSUB-QUESTIONS:\n- a1\nMAIN QUESTION 2: What is B?\nSUB-QUESTIONS:\n- b1\n"
+    result = parse_main_and_sub_questions(text)
+    assert result["main_questions"] == ["What is A?", "What is B?"]
+    assert result["sub_questions_by_main"] == {0: ["a1"], 1: ["b1"]}
+
+def test_questions_without_sub_questions():
+    result = parse_main_and_sub_questions("MAIN QUESTION 1:\nA?\nMAIN QUESTION 2:\nB?\nSUB-QUESTIONS:\n- b1\n")
+    assert result["main_questions"] == ["A?", "B?"]
+    assert result["sub_questions_by_main"] == {1: ["b1"]}
+
+def test_questions_no_headers():
+    assert parse_main_and_sub_questions("no questions here") == {
+        "main_questions": [],
+        "sub_questions": [],
+        "sub_questions_by_main": {},
+    }
+
+MAPPINGS_TEXT = (
+    "SUB-QUESTION: Which regions are most affected?\n"
+    "DATA REQUIREMENTS:\n"
+    "region\n"
+    "death_count\n"
+    "ANALYSIS APPROACH:\n"
+    "Regional comparison\n"
+    "\n"
+    "SUB-QUESTION: How has it changed over time?\n"
+    "DATA REQUIREMENTS:\n"
+    "year\n"
+    "ANALYSIS APPROACH:\n"
+    "Trend analysis\n"
+)
+
+EXPECTED_MAPPINGS = [
+    {
+        "sub_question": "Which regions are most affected?",
+        "data_requirements": "region death_count",
+        "analysis_approach": "Regional comparison",
+    },
+    {
+        "sub_question": "How has it changed over time?",
+        "data_requirements": "year",
+        "analysis_approach": "Trend analysis",
+    },
+]
+
+def test_mappings_standard_format():
+    assert parse_subquestion_mappings(MAPPINGS_TEXT) == EXPECTED_MAPPINGS
+
+def test_mappings_crlf_line_endings():
+    assert parse_subquestion_mappings(MAPPINGS_TEXT.replace("\n", "\r\n")) == EXPECTED_MAPPINGS
+
+def test_mappings_bold_markers_do_not_leak():
+    text = (
+        "**SUB-QUESTION:** q1\n**DATA REQUIREMENTS:**\nvar1\n**ANALYSIS APPROACH:**\nx\n"
+        "**SUB-QUESTION:** q2\n**DATA REQUIREMENTS:**\nvar2\n**ANALYSIS APPROACH:**\ny\n"
+    )
+    assert parse_subquestion_mappings(text) == [
+        {"sub_question": "q1", "data_requirements": "var1", "analysis_approach": "x"},
+        {"sub_question": "q2", "data_requirements": "var2", "analysis_approach": "y"},
+    ]
+
+def test_mappings_list_prefixed_markers_do_not_leak():
+    text = "SUB-QUESTION: q1\n- DATA REQUIREMENTS:\nvar1\n- ANALYSIS APPROACH:\nx\n"
+    assert parse_subquestion_mappings(text) == [
+        {"sub_question": "q1", "data_requirements": "var1", "analysis_approach": "x"},
+    ]
+
+def test_mappings_numbered_sub_questions():
+    text = "1. SUB-QUESTION: q1\nDATA REQUIREMENTS:\nvar1\nANALYSIS APPROACH:\nx\n2. SUB-QUESTION: q2\nDATA REQUIREMENTS:\nv\n"
+    assert parse_subquestion_mappings(text) == [
+        {"sub_question": "q1", "data_requirements": "var1", "analysis_approach": "x"},
+        {"sub_question": "q2", "data_requirements": "v", "analysis_approach": ""},
+    ]
@@ -1,11 +1,23 @@
 """
 Test script for question selection functionality
 """
-import requests
+import asyncio
+import httpx
 import json
 
+from conftest import prewarm, prime_async
+
 BASE_URL = "http://localhost:8000"
 
+# One client for every call; HTTP/2 multiplexes requests over a single connection
+# when the server (or a proxy in front of it) speaks h2, and falls back to HTTP/1.1 otherwise
+CLIENT = httpx.Client(
+    base_url=BASE_URL,
+    http2=True,
+    timeout=300,
+    limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=60)
+)
+
 def test_question_selection_workflow():
     """Test the complete question selection workflow"""
     
@@ -24,7 +36,7 @@ def test_question_selection_workflow():
         ]
     }
     
-    response = requests.post(f"{BASE_URL}/generate-questions", json=project_data)
+    response = CLIENT.post("/generate-questions", json=project_data)
     if response.status_code != 200:
         print(f"Error generating questions: {response.text}")
         return
@@ -50,7 +62,7 @@ def test_question_selection_workflow():
         "selected_main_question_ids": selected_ids
     }
     
-    response = requests.post(f"{BASE_URL}/select-questions", json=selection_data)
+    response = CLIENT.post("/select-questions", json=selection_data)
     if response.status_code != 200:
         print(f"Error selecting questions: {response.text}")
         return
@@ -66,7 +78,7 @@ def test_question_selection_workflow():
         "main_question_ids": selected_ids
     }
     
-    response = requests.post(f"{BASE_URL}/analyze-subquestions", json=analysis_data)
+    response = CLIENT.post("/analyze-subquestions", json=analysis_data)
     if response.status_code != 200:
         print(f"Error analyzing sub-questions: {response.text}")
         return
@@ -83,7 +95,7 @@ def test_question_selection_workflow():
     print("4. Testing analysis of previously selected questions...")
     session_data = {"session_id": session_id}
     
-    response = requests.post(f"{BASE_URL}/analyze-selected-subquestions", json=session_data)
+    response = CLIENT.post("/analyze-selected-subquestions", json=session_data)
     if response.status_code == 200:
         print("✓ Successfully analyzed previously selected sub-questions")
     else:
@@ -91,7 +103,7 @@ def test_question_selection_workflow():
     
     # 5. Get selected questions list
     print("5. Retrieving selected questions...")
-    response = requests.get(f"{BASE_URL}/selected-questions/{session_id}")
+    response = CLIENT.get(f"/selected-questions/{session_id}")
     if response.status_code != 200:
         print(f"Error getting selected questions: {response.text}")
         return
@@ -108,7 +120,7 @@ def test_question_selection_workflow():
     
     # 6. Check session status
     print("6. Checking session status...")
-    response = requests.get(f"{BASE_URL}/session/{session_id}")
+    response = CLIENT.get(f"/session/{session_id}")
     if response.status_code == 200:
         status = response.json()
         print(f"Session status:")
@@ -121,77 +133,83 @@ def test_question_selection_workflow():
     print(f"\nSession ID for further testing: {session_id}")
     return session_id, selected_ids
 
-def test_invalid_selection(session_id):
+async def test_invalid_selection(client: httpx.AsyncClient, session_id):
     """Test error handling for invalid question selection"""
-    print("\n=== Testing Invalid Selection ===")
-    
     # Try to select non-existent question IDs
     invalid_data = {
         "session_id": session_id,
         "selected_main_question_ids": ["invalid-id-1", "invalid-id-2"]
     }
     
-    response = requests.post(f"{BASE_URL}/select-questions", json=invalid_data)
+    response = await client.post("/select-questions", json=invalid_data)
+    # Results are printed after the await so concurrent checks don't interleave their output
+    print("\n=== Testing Invalid Selection ===")
     if response.status_code == 400:
         print("✓ Invalid ID handling works correctly")
         print(f"  Error message: {response.json()['detail']}")
     else:
         print("✗ Invalid ID handling failed")
 
-def test_targeted_analysis(session_id, available_main_ids):
-    """Test analyzing specific main questions by ID"""
-    print("\n=== Testing Targeted Sub-Question Analysis ===")
-    
-    # Test 1: Analyze only the first main question
-    print("1. Analyzing sub-questions for first main question only...")
+async def _analyze_main_questions(client: httpx.AsyncClient, session_id, main_question_ids, label):
+    """Analyze sub-questions for the given main question IDs"""
     analysis_data = {
         "session_id": session_id,
-        "main_question_ids": [available_main_ids[0]]
+        "main_question_ids": main_question_ids
     }
     
-    response = requests.post(f"{BASE_URL}/analyze-subquestions", json=analysis_data)
+    response = await client.post("/analyze-subquestions", json=analysis_data)
+    print(f"Analyzing sub-questions for {label}...")
     if response.status_code == 200:
         result = response.json()
-        print(f"✓ Successfully analyzed {len(result)} sub-questions for 1 main question")
+        print(f"✓ Successfully analyzed {len(result)} sub-questions for {label}")
     else:
         print(f"✗ Failed to analyze: {response.text}")
-    
-    # Test 2: Analyze multiple specific main questions
-    if len(available_main_ids) >= 2:
-        print("2. Analyzing sub-questions for multiple specific main questions...")
-        analysis_data = {
-            "session_id": session_id,
-            "main_question_ids": available_main_ids[:2]
-        }
-        
-        response = requests.post(f"{BASE_URL}/analyze-subquestions", json=analysis_data)
-        if response.status_code == 200:
-            result = response.json()
-            print(f"✓ Successfully analyzed {len(result)} sub-questions for 2 main questions")
-        else:
-            print(f"✗ Failed to analyze: {response.text}")
-    
-    # Test 3: Try to analyze with invalid main question ID
-    print("3. Testing with invalid main question ID...")
+
+async def _analyze_invalid_main_question(client: httpx.AsyncClient, session_id):
+    """Try to analyze with an invalid main question ID"""
     invalid_analysis_data = {
         "session_id": session_id,
         "main_question_ids": ["invalid-main-question-id"]
     }
     
-    response = requests.post(f"{BASE_URL}/analyze-subquestions", json=invalid_analysis_data)
+    response = await client.post("/analyze-subquestions", json=invalid_analysis_data)
+    print("Testing with invalid main question ID...")
     if response.status_code == 400:
         print("✓ Invalid main question ID handling works correctly")
         print(f"  Error message: {response.json()['detail']}")
     else:
         print("✗ Invalid main question ID handling failed")
 
+async def test_targeted_analysis(client: httpx.AsyncClient, session_id, available_main_ids):
+    """Test analyzing specific main questions by ID (independent checks run concurrently)"""
+    print("\n=== Testing Targeted Sub-Question Analysis ===")
+    
+    checks = [
+        _analyze_main_questions(client, session_id, [available_main_ids[0]], "first main question only"),
+        _analyze_invalid_main_question(client, session_id)
+    ]
+    if len(available_main_ids) >= 2:
+        checks.append(_analyze_main_questions(client, session_id, available_main_ids[:2], "2 main questions"))
+    
+    await asyncio.gather(*checks)
+
+async def run_follow_up_tests(session_id, selected_ids):
+    """Probe the populated session with the invalid-selection and targeted-analysis checks at once"""
+    async with httpx.AsyncClient(base_url=BASE_URL, http2=True, timeout=300) as client:
+        await prime_async(client)
+        await asyncio.gather(
+            test_invalid_selection(client, session_id),
+            test_targeted_analysis(client, session_id, selected_ids)
+        )
+
 if __name__ == "__main__":
-    try:
-        session_id, selected_ids = test_question_selection_workflow()
-        if session_id:
-            test_invalid_selection(session_id)
-            test_targeted_analysis(session_id, selected_ids)
-    except requests.exceptions.ConnectionError:
-        print("Error: Cannot connect to API. Make sure the server is running on http://localhost:8000")
-    except Exception as e:
-        print(f"Test failed with error: {e}")
+    with CLIENT:
+        prewarm(CLIENT, BASE_URL)
+        try:
+            session_id, selected_ids = test_question_selection_workflow()
+            if session_id:
+                asyncio.run(run_follow_up_tests(session_id, selected_ids))
+        except httpx.ConnectError:
+            print("Error: Cannot connect to API. Make sure the server is running on http://localhost:8000")
+        except Exception as e:
+            print(f"Test failed with error: {e}")
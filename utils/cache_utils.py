@@ -0,0 +1,162 @@
+"""
+Two-tier (memory + sqlite) TTL cache for slow, slowly-changing lookups
+"""
+import hashlib
+import inspect
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Optional
+
+import orjson
+
+from config.config import get_settings
+
+class TTLCache:
+    """
+    In-process LRU in front of a sqlite table (key TEXT PRIMARY KEY, ts REAL, payload BLOB).
+    Values are stored as bytes from encode (JSON via orjson unless the caller passes its own
+    encode/decode pair), never pickled, so a tampered cache file can't run code on load; every
+    hit decodes a fresh copy callers may mutate. Expired rows are swept on open and deleted when read.
+    Disk errors (read-only filesystem, corrupt file) drop the cache to memory-only.
+    """
+    def __init__(
+        self,
+        name: str,
+        ttl: float,
+        maxsize: int = 256,
+        encode: Callable[[Any], bytes] = orjson.dumps,
+        decode: Callable[[bytes], Any] = orjson.loads
+    ):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._encode = encode
+        self._decode = decode
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+        cache_dir = get_settings().research_cache_dir
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._db = sqlite3.connect(os.path.join(cache_dir, f"{name}.sqlite3"), check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, ts REAL, payload BLOB)")
+            self._db.execute("DELETE FROM entries WHERE ts < ?", (time.time() - ttl,))
+            self._db.commit()
+        except (OSError, sqlite3.Error) as e:
+            print(f"Disk cache '{name}' unavailable, using memory only: {e}")
+            self._db = None
+
+    def _disable_disk(self, error: Exception) -> None:
+        print(f"Disk cache error, using memory only: {error}")
+        self._db = None
+
+    def _forget(self, key: str) -> None:
+        # Caller holds the lock
+        self._memory.pop(key, None)
+        if self._db is not None:
+            try:
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._db.commit()
+            except sqlite3.Error as e:
+                self._disable_disk(e)
+
+    def get(self, key: str) -> Any:
+        """Return the cached value for key, or None when missing or expired"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None and self._db is not None:
+                try:
+                    entry = self._db.execute("SELECT ts, payload FROM entries WHERE key = ?", (key,)).fetchone()
+                except sqlite3.Error as e:
+                    self._disable_disk(e)
+                if entry is not None:
+                    self._remember(key, entry)
+            if entry is None:
+                return None
+            ts, payload = entry
+            if now - ts > self.ttl:
+                self._forget(key)
+                return None
+            self._memory.move_to_end(key)
+        try:
+            return self._decode(payload)
+        except ValueError:
+            # Undecodable row (written by another format or truncated): treat as a miss
+            with self._lock:
+                self._forget(key)
+            return None
+
+    def set(self, key: str, value: Any) -> None:
+        entry = (time.time(), self._encode(value))
+        with self._lock:
+            self._remember(key, entry)
+            if self._db is not None:
+                try:
+                    self._db.execute("INSERT OR REPLACE INTO entries (key, ts, payload) VALUES (?, ?, ?)", (key, *entry))
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    self._disable_disk(e)
+
+    def set_many(self, items: dict) -> None:
+        """Store several values with a single disk commit"""
+        now = time.time()
+        rows = [(key, now, self._encode(value)) for key, value in items.items()]
+        with self._lock:
+            for key, ts, payload in rows:
+                self._remember(key, (ts, payload))
+            if self._db is not None:
+                try:
+                    self._db.executemany("INSERT OR REPLACE INTO entries (key, ts, payload) VALUES (?, ?, ?)", rows)
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    self._disable_disk(e)
+
+    def _remember(self, key: str, entry: tuple) -> None:
+        # Caller holds the lock
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+def cache_key(*parts: Any) -> str:
+    """Stable cache key for the given call arguments"""
+    return hashlib.blake2b("|".join(map(str, parts)).encode("utf-8"), digest_size=16).hexdigest()
+
+def ttl_cached(name: str, ttl: float, maxsize: int = 256) -> Callable:
+    """
+    Cache a function's result on its bound arguments in a TTLCache. Results must be
+    JSON-serializable (they round-trip through orjson, so tuples come back as lists).
+    Empty results are not stored, so a transient upstream failure is retried on the next call.
+    """
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+        cache = None
+        cache_lock = threading.Lock()
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            nonlocal cache
+            if cache is None:
+                with cache_lock:
+                    if cache is None:
+                        cache = TTLCache(name, ttl, maxsize)
+
+            # Bind so f(q, 5) and f(q, limit=5) share an entry
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = cache_key(func.__qualname__, *bound.arguments.values())
+            result = cache.get(key)
+            if result is not None:
+                return result
+
+            result = func(*args, **kwargs)
+            if result:
+                cache.set(key, result)
+            return result
+        return wrapper
+    return decorator
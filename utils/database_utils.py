@@ -1,24 +1,39 @@
 """
 Database schema utilities for exploring available data
 """
-import json
 import os
+import orjson
+from functools import lru_cache
 from typing import Dict, List, Any
 from model.models import DatabaseColumn, DatabaseTable, DatabaseSchemaResponse, TableDetailsResponse
 
-def load_database_schema() -> Dict[str, Any]:
-    """Load the database schema from the JSON file"""
-    schema_path = os.path.join(os.path.dirname(__file__), "..", "database", "database_schema.json")
-    
+try:
+    import ahocorasick
+except ImportError:  # optional: the keyword index falls back to per-keyword substring tests
+    ahocorasick = None
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), "..", "database", "database_schema.json")
+
+@lru_cache(maxsize=4)
+def _load_schema_cached(mtime: float) -> Dict[str, Any]:
+    """Parse the schema file; keyed on its mtime so an edited file is re-read"""
     try:
-        with open(schema_path, 'r', encoding='utf-8') as f:
-            schema = json.load(f)
-        return schema
-    except FileNotFoundError:
-        raise FileNotFoundError(f"Database schema file not found at {schema_path}")
-    except json.JSONDecodeError as e:
+        with open(SCHEMA_PATH, 'rb') as f:
+            return orjson.loads(f.read())
+    except orjson.JSONDecodeError as e:
         raise ValueError(f"Invalid JSON in database schema file: {e}")
 
+def _schema_version() -> float:
+    """Schema file mtime, used as the cache key for everything derived from the schema"""
+    try:
+        return os.path.getmtime(SCHEMA_PATH)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Database schema file not found at {SCHEMA_PATH}")
+
+def load_database_schema() -> Dict[str, Any]:
+    """Load the database schema from the JSON file (parsed once per file version; treat as read-only)"""
+    return _load_schema_cached(_schema_version())
+
 def parse_database_schema() -> DatabaseSchemaResponse:
     """Parse the database schema into structured response format"""
     schema = load_database_schema()
@@ -49,8 +64,7 @@ def parse_database_schema() -> DatabaseSchemaResponse:
         table = DatabaseTable(
             name=table_name,
             description=table_info.get("description", ""),
-            columns=columns,
-            column_count=len(columns)
+            columns=columns
         )
         tables.append(table)
     
@@ -59,7 +73,6 @@ def parse_database_schema() -> DatabaseSchemaResponse:
         version=db_info.get("version", ""),
         description=db_info.get("description", ""),
         tables=tables,
-        total_tables=len(tables),
         last_updated=db_info.get("last_updated", "")
     )
 
@@ -103,7 +116,6 @@ def get_table_details(table_name: str) -> TableDetailsResponse:
         table_name=table_name,
         description=table_info.get("description", ""),
         columns=columns,
-        total_columns=len(columns),
         primary_keys=primary_keys,
         foreign_keys=foreign_keys
     )
@@ -114,61 +126,137 @@ def get_available_table_names() -> List[str]:
     tables_data = schema.get("database", {}).get("tables", {})
     return list(tables_data.keys())
 
-def extract_database_keywords() -> Dict[str, List[str]]:
-    """Extract meaningful keywords from database table names, column names, and descriptions"""
-    schema = load_database_schema()
-    tables_data = schema.get("database", {}).get("tables", {})
+# Words too generic to be useful keywords
+_COMMON_WORDS = frozenset({'for', 'the', 'and', 'with', 'type', 'data', 'null', 'not', 'default', 'reference', 'identifier', 'timestamp', 'character', 'varying'})
+
+def _name_words(name: str) -> tuple:
+    words = (word.lower() for word in name.replace('_', ' ').split() if len(word) > 2)
+    return tuple(word for word in words if word not in _COMMON_WORDS)
+
+def _description_words(description_lc: str) -> tuple:
+    return tuple(
+        word for word in description_lc.replace(',', ' ').replace('.', ' ').split()
+        if len(word) > 3 and word not in _COMMON_WORDS
+    )
+
+@lru_cache(maxsize=4)
+def _searchable_schema(version: float) -> tuple:
+    """
+    Lower-cased and tokenized schema fields, built once per schema version. One entry per table:
+    (table_name, name_lc, description_lc, name_words, description_words, columns), where columns holds
+    (col_name, col_name_lc, col_description_lc, col_name_words, col_description_words) without CONSTRAINT entries
+    """
+    tables_data = _load_schema_cached(version).get("database", {}).get("tables", {})
     
+    searchable = []
+    for table_name, table_info in tables_data.items():
+        table_desc = (table_info.get("description") or "").lower()
+        columns = tuple(
+            (col_name, col_name.lower(), col_desc, _name_words(col_name), _description_words(col_desc))
+            for col_name, col_desc in (
+                (col_name, (col_info.get("description") or "").lower())
+                for col_name, col_info in table_info.get("columns", {}).items()
+                if col_name != "CONSTRAINT"
+            )
+        )
+        searchable.append((
+            table_name, table_name.lower(), table_desc,
+            _name_words(table_name), _description_words(table_desc), columns
+        ))
+    return tuple(searchable)
+
+@lru_cache(maxsize=4)
+def _database_keywords_cached(version: float) -> Dict[str, tuple]:
+    """Sorted keyword tuples per category, built once per schema version"""
     keywords = {
-        "table_names": [],
-        "column_names": [],
-        "descriptions": []
+        "table_names": set(),
+        "column_names": set(),
+        "descriptions": set()
     }
     
-    for table_name, table_info in tables_data.items():
-        # Extract words from table names
-        table_words = table_name.replace('_', ' ').split()
-        keywords["table_names"].extend([word.lower() for word in table_words if len(word) > 2])
-        
-        # Extract words from table description
-        table_desc = table_info.get("description", "")
-        if table_desc:
-            desc_words = table_desc.lower().replace(',', ' ').replace('.', ' ').split()
-            keywords["descriptions"].extend([word for word in desc_words if len(word) > 3])
-        
-        # Extract words from column names and descriptions
-        columns_data = table_info.get("columns", {})
-        for col_name, col_info in columns_data.items():
-            if col_name == "CONSTRAINT":
-                continue
-                
-            # Column name words
-            col_words = col_name.replace('_', ' ').split()
-            keywords["column_names"].extend([word.lower() for word in col_words if len(word) > 2])
-            
-            # Column description words
-            col_desc = col_info.get("description", "")
-            if col_desc:
-                desc_words = col_desc.lower().replace(',', ' ').replace('.', ' ').split()
-                keywords["descriptions"].extend([word for word in desc_words if len(word) > 3])
+    for _, _, _, name_words, desc_words, columns in _searchable_schema(version):
+        keywords["table_names"].update(name_words)
+        keywords["descriptions"].update(desc_words)
+        for _, _, _, col_words, col_desc_words in columns:
+            keywords["column_names"].update(col_words)
+            keywords["descriptions"].update(col_desc_words)
     
-    # Remove duplicates and common words
-    common_words = {'for', 'the', 'and', 'with', 'type', 'data', 'null', 'not', 'default', 'reference', 'identifier', 'timestamp', 'character', 'varying'}
+    # Common words were already dropped while tokenizing
+    return {category: tuple(sorted(words)) for category, words in keywords.items()}
+
+@lru_cache(maxsize=4)
+def _all_db_words(version: float) -> frozenset:
+    """Union of every keyword category, built once per schema version"""
+    return frozenset().union(*_database_keywords_cached(version).values())
+
+def _keyword_hits(automaton, *texts: str) -> set:
+    """Every database keyword occurring as a substring of any of texts, in one automaton pass each"""
+    return {keyword for text in texts for _, keyword in automaton.iter(text)}
+
+def _build_keyword_index_automaton(searchable: tuple, keywords: frozenset) -> Dict[str, tuple]:
+    """Aho-Corasick build: scans each schema string once for all keywords instead of once per keyword"""
+    automaton = ahocorasick.Automaton()
+    for keyword in keywords:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    
+    tables = {keyword: [] for keyword in keywords}
+    columns = {keyword: {} for keyword in keywords}
+    for table_name, name_lc, desc_lc, _, _, cols in searchable:
+        for keyword in _keyword_hits(automaton, name_lc, desc_lc):
+            tables[keyword].append(table_name)
+        for col_name, col_lc, col_desc_lc, _, _ in cols:
+            for keyword in _keyword_hits(automaton, col_lc, col_desc_lc):
+                columns[keyword].setdefault(table_name, []).append(col_name)
+    
+    return {
+        keyword: (tuple(tables[keyword]), {table_name: tuple(cols) for table_name, cols in columns[keyword].items()})
+        for keyword in keywords
+    }
+
+@lru_cache(maxsize=4)
+def _keyword_index(version: float) -> Dict[str, tuple]:
+    """
+    Inverted index, built once per schema version, from each database keyword to
+    (tables whose name or description contains it, {table: columns whose name or description contains it})
+    """
+    searchable = _searchable_schema(version)
+    keywords = _all_db_words(version)
     
-    for category in keywords:
-        keywords[category] = list(set(keywords[category]) - common_words)
-        keywords[category].sort()
+    if ahocorasick is not None and keywords:
+        return _build_keyword_index_automaton(searchable, keywords)
     
-    return keywords
+    index = {}
+    for keyword in keywords:
+        tables = tuple(
+            table_name for table_name, name_lc, desc_lc, _, _, _ in searchable
+            if keyword in name_lc or keyword in desc_lc
+        )
+        columns = {}
+        for table_name, _, _, _, _, cols in searchable:
+            matching_cols = tuple(
+                col_name for col_name, col_lc, col_desc_lc, _, _ in cols
+                if keyword in col_lc or keyword in col_desc_lc
+            )
+            if matching_cols:
+                columns[table_name] = matching_cols
+        index[keyword] = (tables, columns)
+    return index
+
+def extract_database_keywords() -> Dict[str, List[str]]:
+    """Extract meaningful keywords from database table names, column names, and descriptions"""
+    # Fresh lists per call so callers can't mutate the cached tuples
+    return {
+        category: list(words)
+        for category, words in _database_keywords_cached(_schema_version()).items()
+    }
 
 def find_relevant_tables_by_research_context(research_keywords: List[str]) -> Dict[str, Any]:
     """Find relevant tables and columns based on research keywords using database vocabulary"""
-    schema = load_database_schema()
-    tables_data = schema.get("database", {}).get("tables", {})
+    version = _schema_version()
     
     # Get all database keywords
-    db_keywords = extract_database_keywords()
-    all_db_words = set(db_keywords["table_names"] + db_keywords["column_names"] + db_keywords["descriptions"])
+    all_db_words = _all_db_words(version)
     
     # Find matches between research keywords and database keywords
     research_words = set([word.lower().strip('.,!?') for word in research_keywords if len(word) > 3])
@@ -177,47 +265,14 @@ def find_relevant_tables_by_research_context(research_keywords: List[str]) -> Di
     relevant_tables = {}
     relevant_columns = {}
     
-    # Search for matching keywords in tables and columns
+    # Every database keyword's table and column hits are precomputed; copy them out per call
+    keyword_index = _keyword_index(version)
     for keyword in matching_keywords:
-        # Search in table names and descriptions
-        for table_name, table_info in tables_data.items():
-            table_match = False
-            
-            # Check table name
-            if keyword in table_name.lower():
-                if keyword not in relevant_tables:
-                    relevant_tables[keyword] = []
-                relevant_tables[keyword].append(table_name)
-                table_match = True
-            
-            # Check table description
-            table_desc = table_info.get("description", "").lower()
-            if keyword in table_desc and not table_match:
-                if keyword not in relevant_tables:
-                    relevant_tables[keyword] = []
-                relevant_tables[keyword].append(table_name)
-            
-            # Check columns in this table
-            columns_data = table_info.get("columns", {})
-            matching_cols = []
-            
-            for col_name, col_info in columns_data.items():
-                if col_name == "CONSTRAINT":
-                    continue
-                    
-                # Check column name
-                if keyword in col_name.lower():
-                    matching_cols.append(col_name)
-                
-                # Check column description
-                col_desc = col_info.get("description", "").lower()
-                if keyword in col_desc and col_name not in matching_cols:
-                    matching_cols.append(col_name)
-            
-            if matching_cols:
-                if keyword not in relevant_columns:
-                    relevant_columns[keyword] = {}
-                relevant_columns[keyword][table_name] = matching_cols
+        tables, columns = keyword_index[keyword]
+        if tables:
+            relevant_tables[keyword] = list(tables)
+        if columns:
+            relevant_columns[keyword] = {table_name: list(cols) for table_name, cols in columns.items()}
     
     return {
         "database_keywords_found": list(matching_keywords),
@@ -227,22 +282,20 @@ def find_relevant_tables_by_research_context(research_keywords: List[str]) -> Di
         "total_matches": len(matching_keywords)
     }
 
+@lru_cache(maxsize=4)
+def _schema_counts(version: float) -> tuple:
+    """(total_tables, total_columns) without CONSTRAINT entries, counted once per schema version"""
+    searchable = _searchable_schema(version)
+    return len(searchable), sum(len(columns) for *_, columns in searchable)
+
 def get_database_summary() -> Dict[str, Any]:
     """Get a summary of the database with key statistics and available keywords"""
-    schema = load_database_schema()
-    db_info = schema.get("database", {})
-    tables_data = db_info.get("tables", {})
-    
-    # Calculate statistics
-    total_tables = len(tables_data)
-    total_columns = 0
-    
-    for table_info in tables_data.values():
-        columns_count = len([col for col in table_info.get("columns", {}).keys() if col != "CONSTRAINT"])
-        total_columns += columns_count
+    version = _schema_version()
+    db_info = _load_schema_cached(version).get("database", {})
     
-    # Get available keywords
-    db_keywords = extract_database_keywords()
+    # Counts and keywords come from the per-version tokenized schema; no second traversal here
+    total_tables, total_columns = _schema_counts(version)
+    db_keywords = _database_keywords_cached(version)
     
     return {
         "database_name": db_info.get("name", ""),
@@ -254,9 +307,9 @@ def get_database_summary() -> Dict[str, Any]:
             "avg_columns_per_table": round(total_columns / total_tables, 1) if total_tables > 0 else 0
         },
         "available_keywords": {
-            "from_table_names": db_keywords["table_names"][:10],  # First 10
-            "from_column_names": db_keywords["column_names"][:15],  # First 15
-            "from_descriptions": db_keywords["descriptions"][:20]  # First 20
+            "from_table_names": list(db_keywords["table_names"][:10]),  # First 10
+            "from_column_names": list(db_keywords["column_names"][:15]),  # First 15
+            "from_descriptions": list(db_keywords["descriptions"][:20])  # First 20
         },
-        "table_names": list(tables_data.keys())
+        "table_names": list(db_info.get("tables", {}).keys())
     }
@@ -5,51 +5,82 @@ import re
 from typing import Dict, List, Any
 
 
+# Patterns for the fixed PROMPT_STEP2/STEP3/STEP4 output grammar, compiled once at import
+
+# One match per "MAIN QUESTION N:" header line: text after the first colon is an inline main
+# question, and the body runs up to the next header (interleaved prose lines included)
+_QUESTION_BLOCK_RE = re.compile(
+    r"^[ \t]*MAIN QUESTION[^\n:]*:(?P<inline>[^\n]*)$"
+    r"(?P<body>(?:\n(?![ \t]*MAIN QUESTION[^\n]*:)[^\n]*)*)",
+    re.MULTILINE
+)
+_SUB_HEADER_RE = re.compile(r"^[ \t]*SUB-QUESTIONS:[ \t]*$", re.MULTILINE)
+_FIRST_LINE_RE = re.compile(r"^[ \t]*(\S[^\n]*?)[ \t]*$", re.MULTILINE)
+_SUB_ITEM_RE = re.compile(r"^[ \t]*- (.*?)[ \t]*$", re.MULTILINE)
+
+# Section markers for sub-question mappings. A leading list/heading prefix ("- ", "1. ", "### ")
+# and markdown bold on either side belong to the marker, so they never leak into the previous field
+_MAPPING_MARKER_RE = re.compile(
+    r"(?:^[ \t]*(?:[-*\u2022]|\d+[.)]|#+)?[ \t]*)?\**[ \t]*"
+    r"(SUB-QUESTION|DATA REQUIREMENTS|ANALYSIS APPROACH):\**",
+    re.MULTILINE
+)
+_LINE_BREAK_RE = re.compile(r"[ \t]*\n[ \t]*")
+
+def _normalize_newlines(text: str) -> str:
+    # LLM output may arrive with CRLF (or bare CR) line endings
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+# One match per data gap record with named fields; the gaps between headers are bounded so a
+# malformed response can't make the lazy segments backtrack across the whole text
+_MISSING_VARIABLE_RE = re.compile(
+    r"MISSING VARIABLE:(?P<variable>[^\n]+)[\s\S]{0,500}?"
+    r"GAP DESCRIPTION:(?P<description>[^\n]+)[\s\S]{0,500}?"
+    r"SUGGESTED SOURCES:(?P<sources>[^\n]+)(?:[\s\S]*?)"
+    r"(?:SUB-QUESTION:(?P<sub_question>[^\n]+)|$)",
+    re.IGNORECASE
+)
+
+# Fallbacks for gaps written as list items ("1. Missing: healthcare_access_data ...") or prose
+_GAP_LIST_ITEM_RE = re.compile(
+    r"(?:\d+\.|\*|\-)[\s\t]*(?:Missing|Needed|Required):?\s*([a-zA-Z0-9_]+)[\s\S]{0,500}?"
+    r"(?:Description|Gap):?\s*([^\n]+)[\s\S]{0,500}?"
+    r"(?:Sources|Data sources):?\s*([^\n]+)",
+    re.IGNORECASE
+)
+_SENTENCE_SPLIT_RE = re.compile(r"[.!?]\s+")
+_MISSING_PHRASE_RE = re.compile(r"missing\s+([a-zA-Z0-9_]+(?:\s+[a-zA-Z0-9_]+){0,2})")
+
+
 def parse_main_and_sub_questions(text: str) -> dict:
     """Parse the text response to extract multiple main questions and their sub-questions."""
-    lines = text.strip().split('\n')
-    
     main_questions = []
     sub_questions_map = {}  # Maps main question index to list of sub-questions
+    all_sub_questions = []  # Flattened sub-questions with main question references
     
-    current_main_index = -1
-    collecting_sub_questions = False
-    
-    for line in lines:
-        line = line.strip()
-        
-        # Check for main question headers (MAIN QUESTION 1:, MAIN QUESTION 2:, etc.)
-        if line.startswith("MAIN QUESTION") and ":" in line:
-            # Extract the main question from the next non-empty line
-            current_main_index = len(main_questions)
-            collecting_sub_questions = False
-            continue
+    for match in _QUESTION_BLOCK_RE.finditer(_normalize_newlines(text)):
+        main_index = len(main_questions)
+        body = match.group("body")
         
-        # Check for sub-questions header
-        elif line == "SUB-QUESTIONS:":
-            collecting_sub_questions = True
-            if current_main_index not in sub_questions_map:
-                sub_questions_map[current_main_index] = []
-            continue
+        # Sub-questions are the "- " items anywhere after the SUB-QUESTIONS: header
+        sub_header = _SUB_HEADER_RE.search(body)
+        before_subs = body[:sub_header.start()] if sub_header else body
         
-        # Collect main question text (first non-empty line after MAIN QUESTION header)
-        elif current_main_index >= 0 and len(main_questions) == current_main_index and line and not collecting_sub_questions:
-            main_questions.append(line)
+        # Main question: inline header text, else the first non-empty line before SUB-QUESTIONS:
+        main_text = match.group("inline").strip()
+        if not main_text:
+            first_line = _FIRST_LINE_RE.search(before_subs)
+            main_text = first_line.group(1) if first_line else ""
+        if main_text:
+            main_questions.append(main_text)
         
-        # Collect sub-questions
-        elif collecting_sub_questions and line.startswith("- "):
-            if current_main_index in sub_questions_map:
-                sub_questions_map[current_main_index].append(line[2:])
-    
-    # Convert to the expected format - flatten all sub-questions with main question references
-    all_sub_questions = []
-    for main_idx, sub_list in sub_questions_map.items():
-        for sub_q in sub_list:
-            all_sub_questions.append({
-                "text": sub_q,
-                "main_question_index": main_idx,
-                "main_question_text": main_questions[main_idx] if main_idx < len(main_questions) else ""
-            })
+        if sub_header:
+            sub_list = _SUB_ITEM_RE.findall(body, sub_header.end())
+            sub_questions_map.setdefault(main_index, []).extend(sub_list)
+            all_sub_questions.extend(
+                {"text": sub_q, "main_question_index": main_index, "main_question_text": main_text}
+                for sub_q in sub_list
+            )
     
     return {
         "main_questions": main_questions,
@@ -60,44 +91,26 @@ def parse_main_and_sub_questions(text: str) -> dict:
 
 def parse_subquestion_mappings(text: str) -> list:
     """Parse the text response to extract sub-question mappings."""
-    sections = text.split("SUB-QUESTION:")
+    text = _normalize_newlines(text)
+    markers = list(_MAPPING_MARKER_RE.finditer(text))
     mappings = []
+    current = None
     
-    for section in sections[1:]:  # Skip the first empty element
-        lines = section.strip().split('\n')
-        sub_question = lines[0].strip()
-        
-        data_req = ""
-        analysis = ""
-        
-        in_data_req = False
-        in_analysis = False
-        data_req_lines = []
-        analysis_lines = []
-        
-        for line in lines[1:]:  # Skip the first line which is the sub-question
-            if "DATA REQUIREMENTS:" in line:
-                in_data_req = True
-                in_analysis = False
-                continue
-            elif "ANALYSIS APPROACH:" in line:
-                in_data_req = False
-                in_analysis = True
-                continue
-            
-            if in_data_req:
-                data_req_lines.append(line.strip())
-            elif in_analysis:
-                analysis_lines.append(line.strip())
+    for i, marker in enumerate(markers):
+        section_end = markers[i + 1].start() if i + 1 < len(markers) else len(text)
+        section = text[marker.end():section_end].strip()
+        label = marker.group(1)
         
-        data_req = " ".join(data_req_lines).strip()
-        analysis = " ".join(analysis_lines).strip()
-        
-        mappings.append({
-            "sub_question": sub_question,
-            "data_requirements": data_req,
-            "analysis_approach": analysis
-        })
+        if label == "SUB-QUESTION":
+            current = {
+                "sub_question": section.split("\n", 1)[0].strip(),
+                "data_requirements": "",
+                "analysis_approach": ""
+            }
+            mappings.append(current)
+        elif current is not None:
+            key = "data_requirements" if label == "DATA REQUIREMENTS" else "analysis_approach"
+            current[key] = _LINE_BREAK_RE.sub(" ", section)
     
     return mappings
 
@@ -109,15 +122,12 @@ def parse_data_gaps(text: str) -> list:
     # Improved parser that can handle different formats
     
     # First try: Format with clear MISSING VARIABLE: headers
-    missing_var_pattern = r"MISSING VARIABLE:([^\n]+)(?:[\s\S]*?)GAP DESCRIPTION:([^\n]+)(?:[\s\S]*?)SUGGESTED SOURCES:([^\n]+)(?:[\s\S]*?)(?:SUB-QUESTION:([^\n]+)|$)"
-    matches = re.finditer(missing_var_pattern, text, re.IGNORECASE)
-    
-    for match in matches:
+    for match in _MISSING_VARIABLE_RE.finditer(text):
         # Extract components
-        var_name = match.group(1).strip()
-        description = match.group(2).strip()
-        sources = match.group(3).strip()
-        sub_question = match.group(4).strip() if match.group(4) else "General research question"
+        var_name = match.group("variable").strip()
+        description = match.group("description").strip()
+        sources = match.group("sources").strip()
+        sub_question = match.group("sub_question").strip() if match.group("sub_question") else "General research question"
         
         # Skip if variable name is literally just "variable"
         if var_name.lower() != "variable":
@@ -134,10 +144,7 @@ def parse_data_gaps(text: str) -> list:
     
     # Second try: Look for bullet points or numbered lists with variable names
     # This handles formats like "1. Missing variable: healthcare_access_data"
-    list_pattern = r"(?:\d+\.|\*|\-)[\s\t]*(?:Missing|Needed|Required):?\s*([a-zA-Z0-9_]+)(?:[\s\S]*?)(?:Description|Gap):?\s*([^\n]+)(?:[\s\S]*?)(?:Sources|Data sources):?\s*([^\n]+)"
-    matches = re.finditer(list_pattern, text, re.IGNORECASE)
-    
-    for match in matches:
+    for match in _GAP_LIST_ITEM_RE.finditer(text):
         var_name = match.group(1).strip()
         description = match.group(2).strip() if match.group(2) else "No description provided"
         sources = match.group(3).strip() if match.group(3) else "No sources specified"
@@ -155,11 +162,11 @@ def parse_data_gaps(text: str) -> list:
         return gaps
     
     # Third try: Look for sentences with specific missing data mentions
-    sentences = re.split(r'[.!?]\s+', text)
-    for sentence in sentences:
-        if "missing" in sentence.lower() and any(term in sentence.lower() for term in ["data", "variable", "information"]):
+    for sentence in _SENTENCE_SPLIT_RE.split(text):
+        sentence_lower = sentence.lower()
+        if "missing" in sentence_lower and any(term in sentence_lower for term in ["data", "variable", "information"]):
             # Try to extract a meaningful variable name
-            var_match = re.search(r'missing\s+([a-zA-Z0-9_]+(?:\s+[a-zA-Z0-9_]+){0,2})', sentence.lower())
+            var_match = _MISSING_PHRASE_RE.search(sentence_lower)
             if var_match:
                 var_name = var_match.group(1)
                 # Skip common false positives
@@ -1,47 +1,151 @@
+import numpy as np
+import orjson
 import requests
-from sentence_transformers import SentenceTransformer, util
+import threading
+import torch
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from sentence_transformers import SentenceTransformer
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Optional
 import time
+from config.config import get_settings
+from utils.cache_utils import TTLCache, cache_key, ttl_cached
+
+# -----------------------
+# Shared HTTP session: keeps TLS connections to both APIs alive across searches
+# (sized for the concurrent literature fan-out in the research nodes). Rate limits and
+# transient 5xx get two quick retries; (connect, read) timeouts bound a stuck endpoint.
+# -----------------------
+FETCH_TIMEOUT = (3, 10)
+_RETRY = Retry(
+    total=2,
+    backoff_factor=0.3,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=("GET",),
+    raise_on_status=False
+)
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=16, max_retries=_RETRY))
 
 # -----------------------
 # Global model cache to avoid reloading
 # -----------------------
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
 _model_cache = None
+_model_variant = EMBEDDING_MODEL_NAME
+_model_lock = threading.Lock()
 
 def load_model():
-    global _model_cache
-    if _model_cache is None:
+    global _model_cache, _model_variant
+    if _model_cache is not None:
+        return _model_cache
+    # The background warmup and a first request may race; only one of them loads
+    with _model_lock:
+        if _model_cache is not None:
+            return _model_cache
         print("Loading SentenceTransformer model (one-time setup)...")
-        _model_cache = SentenceTransformer("all-MiniLM-L6-v2")
+        model = SentenceTransformer(EMBEDDING_MODEL_NAME)
+        variant = EMBEDDING_MODEL_NAME
+        if get_settings().quantize_embeddings and model.device.type == "cpu":
+            # int8 weights for the Linear layers (activations quantized on the fly); ranking is
+            # dominated by the recency/citation weights, so FP32 similarity precision buys little
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            variant = f"{EMBEDDING_MODEL_NAME}-int8"
+        _model_variant = variant
+        _model_cache = model
     return _model_cache
 
+# -----------------------
+# Persistent paper embedding cache: the same papers come back across related queries
+# -----------------------
+EMBEDDING_CACHE_TTL = 30 * 24 * 3600
+_embedding_cache = None
+_embedding_cache_lock = threading.Lock()
+
+def _encode_embedding(embedding: np.ndarray) -> bytes:
+    return np.asarray(embedding, dtype=np.float32).tobytes()
+
+def _decode_embedding(payload: bytes) -> np.ndarray:
+    return np.frombuffer(payload, dtype=np.float32)
+
+def get_embedding_cache() -> TTLCache:
+    global _embedding_cache
+    if _embedding_cache is None:
+        # Ranking runs on several pool threads; only one of them opens the cache
+        with _embedding_cache_lock:
+            if _embedding_cache is None:
+                # Vectors are stored as raw float32 bytes
+                _embedding_cache = TTLCache(
+                    "embeddings",
+                    ttl=EMBEDDING_CACHE_TTL,
+                    maxsize=4096,
+                    encode=_encode_embedding,
+                    decode=_decode_embedding
+                )
+    return _embedding_cache
+
+def _paper_cache_key(paper: Dict[str, Any]) -> str:
+    identity = paper.get("url") or f"{paper.get('title') or ''}|{(paper.get('abstract') or '')[:200]}"
+    # Keyed by model variant so FP32 and int8 vectors never mix
+    return cache_key(_model_variant, identity)
+
+def encode_papers(model, papers: List[Dict[str, Any]], texts: List[str]) -> np.ndarray:
+    """Normalized embeddings for papers; only papers missing from the embedding cache are encoded"""
+    # Cached vectors belong to the default model; any other model always encodes
+    cache = get_embedding_cache() if model is _model_cache else None
+    
+    keys = [_paper_cache_key(paper) for paper in papers] if cache is not None else []
+    embeddings = [cache.get(key) for key in keys] if cache is not None else [None] * len(papers)
+    misses = [i for i, embedding in enumerate(embeddings) if embedding is None]
+    
+    if misses:
+        encoded = model.encode(
+            [texts[i] for i in misses],
+            batch_size=32,
+            show_progress_bar=False,
+            normalize_embeddings=True
+        )
+        for i, embedding in zip(misses, encoded):
+            embeddings[i] = embedding
+        if cache is not None:
+            cache.set_many({keys[i]: embeddings[i] for i in misses})
+    
+    return np.stack(embeddings)
+
 # -----------------------
 # Fetch from CrossRef
 # -----------------------
+def _first(values: Optional[list]) -> Any:
+    """First element of a CrossRef list field, None when missing or empty"""
+    return values[0] if values else None
+
 def fetch_crossref(query: str, rows: int = 5) -> List[Dict[str, Any]]:
     """Fetch papers from CrossRef API"""
     url = "https://api.crossref.org/works"
     params = {"query": query, "rows": rows}
     
     try:
-        response = requests.get(url, params=params)
+        response = _SESSION.get(url, params=params, timeout=FETCH_TIMEOUT)
         if response.status_code != 200:
             return []
 
-        data = response.json()
-        results = []
-        for item in data.get("message", {}).get("items", []):
-            results.append({
+        data = orjson.loads(response.content)
+        # Untitled records are skipped rather than ranked as empty text
+        return [
+            {
                 "source": "CrossRef",
-                "title": item.get("title", [""])[0],
+                "title": item["title"][0],
                 "abstract": item.get("abstract", ""),
-                "authors": [f"{a.get('given', '')} {a.get('family', '')}" for a in item.get("author", [])] if "author" in item else [],
-                "year": item.get("issued", {}).get("date-parts", [[None]])[0][0],
+                "authors": [f"{a.get('given', '')} {a.get('family', '')}" for a in item.get("author", ())],
+                "year": _first(_first(item.get("issued", {}).get("date-parts"))),
                 "citations": item.get("is-referenced-by-count", 0),
-                "venue": item.get("container-title", [""])[0],
+                "venue": _first(item.get("container-title")) or "",
                 "url": item.get("URL", "")
-            })
-        return results
+            }
+            for item in data.get("message", {}).get("items", ())
+            if item.get("title")
+        ]
     except Exception as e:
         print(f"CrossRef API error: {str(e)}")
         return []
@@ -59,28 +163,36 @@ def fetch_semantic_scholar(query: str, limit: int = 5) -> List[Dict[str, Any]]:
     }
     
     try:
-        response = requests.get(url, params=params)
+        response = _SESSION.get(url, params=params, timeout=FETCH_TIMEOUT)
         if response.status_code != 200:
             return []
 
-        data = response.json()
-        results = []
-        for paper in data.get("data", []):
-            results.append({
+        data = orjson.loads(response.content)
+        return [
+            {
                 "source": "Semantic Scholar",
-                "title": paper.get("title", ""),
+                "title": paper["title"],
                 "abstract": paper.get("abstract", ""),
-                "authors": [a.get("name") for a in paper.get("authors", [])],
+                "authors": [a.get("name") for a in paper.get("authors") or ()],
                 "year": paper.get("year"),
                 "citations": paper.get("citationCount", 0),
                 "venue": paper.get("venue"),
                 "url": paper.get("url", "")
-            })
-        return results
+            }
+            for paper in data.get("data") or ()
+            if paper.get("title")
+        ]
     except Exception as e:
         print(f"Semantic Scholar API error: {str(e)}")
         return []
 
+def fetch_all_sources(query: str, limit: int = 5) -> tuple:
+    """Fetch from Semantic Scholar and CrossRef concurrently; returns (ss_results, cr_results)"""
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        ss_future = executor.submit(fetch_semantic_scholar, query, limit)
+        cr_future = executor.submit(fetch_crossref, query, limit)
+        return ss_future.result(), cr_future.result()
+
 # -----------------------
 # Merge and rank results
 # -----------------------
@@ -91,6 +203,20 @@ def merge_results(*sources) -> List[Dict[str, Any]]:
         combined.extend(src)
     return combined
 
+# Confidence tiers by score: below 0.2 is very_low, 0.8 and above is highest (hierarchy rank 5 down to 1)
+CONFIDENCE_THRESHOLDS = (0.2, 0.4, 0.6, 0.8)
+CONFIDENCE_TIERS = ("very_low", "low", "medium", "high", "highest")
+
+def _year_or_zero(year: Any) -> int:
+    """Publication year as an int, 0 when missing or unparseable (explicit checks, no exception path)"""
+    if isinstance(year, bool) or not year:
+        return 0
+    if isinstance(year, (int, float)):
+        return int(year)
+    if isinstance(year, str) and year.strip().isdigit():
+        return int(year)
+    return 0
+
 def rank_by_relevance(query: str, papers: List[Dict[str, Any]], model=None) -> List[Dict[str, Any]]:
     """Rank papers by relevance with hierarchical confidence scoring"""
     if not papers:
@@ -100,59 +226,53 @@ def rank_by_relevance(query: str, papers: List[Dict[str, Any]], model=None) -> L
         model = load_model()
         
     try:
-        query_emb = model.encode(query, convert_to_tensor=True)
+        query_emb = model.encode(query, normalize_embeddings=True)
+        
+        # Avoid encoding empty texts
+        texts = [f"{paper.get('title', '')} {paper.get('abstract', '')}" for paper in papers]
+        to_encode = [i for i, text in enumerate(texts) if text.strip()]
+        
+        # One batched forward pass for the uncached papers; with normalized embeddings cosine is a dot product
+        encoded = np.zeros(len(papers), dtype=bool)
+        similarities = np.zeros(len(papers))
+        if to_encode:
+            paper_embs = encode_papers(model, [papers[i] for i in to_encode], [texts[i] for i in to_encode])
+            encoded[to_encode] = True
+            similarities[to_encode] = paper_embs @ query_emb
         
-        for paper in papers:
-            title = paper.get('title', '')
-            abstract = paper.get('abstract', '')
-            text = f"{title} {abstract}"
+        # Scoring runs over parallel arrays (one entry per paper) rather than per-dict float math
+        years = np.array([_year_or_zero(paper.get("year")) for paper in papers], dtype=np.float64)
+        citations = np.array([paper.get("citations") or 0 for paper in papers], dtype=np.float64)
+        
+        if not years.any() and not citations.any():
+            # No year or citation metadata at all (common for CrossRef-only results): both factors are 1
+            scores = similarities
+        else:
+            # Enhanced weighted scoring with stronger hierarchy: more aggressive recency weighting
+            recency_factor = np.where(years != 0, np.minimum(2.0, 1 + 5 / np.maximum(1, 2025 - years)), 1.0)
+            
+            # Enhanced citation factor with logarithmic scaling, only evaluated for cited papers
+            cited = citations > 0
+            citation_factor = 1 + 0.1 * np.power(citations, 0.3, where=cited, out=np.zeros_like(citations))
             
-            # Avoid encoding empty texts
-            if not text.strip():
+            # Calculate final relevance scores
+            scores = similarities * recency_factor * citation_factor
+        
+        # Bucket scores into confidence tiers
+        tiers = np.digitize(scores, CONFIDENCE_THRESHOLDS)
+        
+        for paper, is_encoded, score, tier in zip(papers, encoded.tolist(), scores.tolist(), tiers.tolist()):
+            if not is_encoded:
                 paper["relevance"] = 0
                 paper["confidence_tier"] = "low"
                 continue
-                
-            paper_emb = model.encode(text, convert_to_tensor=True)
-            semantic_similarity = util.cos_sim(query_emb, paper_emb).item()
-            
-            # Enhanced weighted scoring with stronger hierarchy
-            recency_factor = 1.0
-            if paper["year"]:
-                try:
-                    years_old = max(1, 2025 - int(paper["year"]))
-                    # More aggressive recency weighting for better hierarchy
-                    recency_factor = min(2.0, 1 + (5 / years_old))
-                except (ValueError, TypeError):
-                    pass
-            
-            # Enhanced citation factor with logarithmic scaling
-            citation_count = paper.get("citations", 0) or 0
-            citation_factor = 1 + (0.1 * (citation_count ** 0.3)) if citation_count > 0 else 1
-            
-            # Calculate final relevance score
-            final_score = semantic_similarity * recency_factor * citation_factor
-            paper["relevance"] = final_score
-            
-            # Assign confidence tiers based on score thresholds for clear hierarchy
-            if final_score >= 0.8:
-                paper["confidence_tier"] = "highest"
-                paper["hierarchy_rank"] = 1
-            elif final_score >= 0.6:
-                paper["confidence_tier"] = "high"
-                paper["hierarchy_rank"] = 2
-            elif final_score >= 0.4:
-                paper["confidence_tier"] = "medium"
-                paper["hierarchy_rank"] = 3
-            elif final_score >= 0.2:
-                paper["confidence_tier"] = "low"
-                paper["hierarchy_rank"] = 4
-            else:
-                paper["confidence_tier"] = "very_low"
-                paper["hierarchy_rank"] = 5
+            paper["relevance"] = score
+            paper["confidence_tier"] = CONFIDENCE_TIERS[tier]
+            paper["hierarchy_rank"] = len(CONFIDENCE_TIERS) - tier
         
-        # Sort by relevance score (highest first) for clear hierarchy
-        papers.sort(key=lambda x: x.get("relevance", 0), reverse=True)
+        # Sort by relevance score (highest first) for clear hierarchy; stable like list.sort
+        order = np.argsort(-scores, kind="stable")
+        papers[:] = [papers[i] for i in order.tolist()]
         
         # Add position indicators for the hierarchy
         for i, paper in enumerate(papers):
@@ -178,15 +298,16 @@ def rank_by_relevance(query: str, papers: List[Dict[str, Any]], model=None) -> L
         print(f"Error ranking papers: {str(e)}")
         return papers
 
+# Results change on the scale of days; repeat queries (also across restarts) skip the APIs and the model
+@ttl_cached("literature", ttl=get_settings().literature_cache_ttl)
 def search_literature(query: str, limit: int = 5) -> List[Dict[str, Any]]:
     """Search and rank papers from multiple academic sources with relevance scoring"""
     
     print(f"Searching literature for: '{query[:50]}...' (limit: {limit})")
     start_time = time.time()
     
-    # Fetch from both academic sources for comprehensive results
-    ss_results = fetch_semantic_scholar(query, limit=limit)
-    cr_results = fetch_crossref(query, rows=limit)
+    # Fetch from both academic sources for comprehensive results (in parallel)
+    ss_results, cr_results = fetch_all_sources(query, limit)
     
     # Combine results from both sources
     combined = merge_results(ss_results, cr_results)
@@ -213,10 +334,17 @@ def search_literature_with_ranking(query: str, limit: int = 5) -> List[Dict[str,
     """Slower but higher quality search with relevance ranking"""
     model = load_model()
     
-    ss_results = fetch_semantic_scholar(query, limit=limit)
-    cr_results = fetch_crossref(query, rows=limit)
+    ss_results, cr_results = fetch_all_sources(query, limit)
     
     combined = merge_results(ss_results, cr_results)
     ranked = rank_by_relevance(query, combined, model)
     
     return ranked[:limit]
+
+def start_model_warmup() -> None:
+    """
+    Load the ranking model in a background thread so its cold start overlaps serving.
+    Called per worker from the app lifespan (after any gunicorn --preload fork), never at import:
+    torch and tokenizer thread pools are not fork-safe.
+    """
+    threading.Thread(target=load_model, name="embedding-model-warmup", daemon=True).start()
@@ -0,0 +1,19 @@
+"""
+Time utilities for cheap, frequently-requested timestamps
+"""
+import time
+from datetime import datetime
+
+# (time, formatted) cached at one-second granularity; replaced as one tuple so readers never see a torn pair
+_ts_cache = (0.0, "")
+
+def now_iso() -> str:
+    """Return the current local time as an ISO string, refreshed at most once per second"""
+    global _ts_cache
+    cached_t, cached_s = _ts_cache
+    t = time.time()
+    if t - cached_t < 1.0:
+        return cached_s
+    s = datetime.fromtimestamp(t).isoformat()
+    _ts_cache = (t, s)
+    return s